@@ -16,5 +16,5 @@
 import importlib.resources
 
 
-version = importlib.resources.read_text("metapype", "VERSION.txt")
+version = importlib.resources.files("metapype").joinpath("VERSION.txt").read_text(encoding="utf-8")
 __version__ = version.strip()
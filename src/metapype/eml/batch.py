@@ -0,0 +1,126 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+""":Mod: batch
+
+:Synopsis:
+    Validation and evaluation of many EML documents across worker processes. Each
+    document is parsed in a worker into a Metapype model whose nodes are not
+    registered in a node store, is checked there, and only its errors or warnings
+    are returned, as picklable records that carry the location path and identifier
+    of each node instead of the node itself (see ValidationErrorRecord). Used by
+    validate.batch() and evaluate.batch().
+
+:Author:
+    agent
+
+:Created:
+    10/17/26
+"""
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import functools
+import os
+from typing import Callable, Iterable, Iterator, NamedTuple
+
+import daiquiri
+
+from metapype.eml.validation_errors import ValidationErrorRecord, resolve_paths
+from metapype.model import metapype_io
+from metapype.model.node import Node
+
+
+logger = daiquiri.getLogger(__name__)
+
+
+class BatchResult(NamedTuple):
+    """
+    Outcome of checking one document of a batch
+    """
+
+    index: int  # Position of the document in the batch
+    source: str  # File system path of the document, or None for XML content
+    records: list  # Errors or warnings as ValidationErrorRecords
+    failure: str  # None, or why the document could not be read, parsed, or checked
+
+
+def _is_xml(document) -> bool:
+    if isinstance(document, (bytes, bytearray, memoryview)):
+        return True
+    return isinstance(document, str) and document.lstrip().startswith("<")
+
+
+def _load(document) -> Node:
+    if _is_xml(document):
+        return metapype_io.from_xml(document, register=False)
+    return metapype_io.from_xml_file(document, register=False)
+
+
+def record(entry) -> ValidationErrorRecord:
+    """
+    Converts an error or warning tuple of (code, msg, node, *args) into a picklable
+    record, which only holds a weak reference to the node
+
+    Args:
+        entry: error or warning tuple, or ValidationErrorRecord
+
+    Returns:
+        ValidationErrorRecord
+    """
+    if isinstance(entry, ValidationErrorRecord):
+        return entry
+    return ValidationErrorRecord(*entry)
+
+
+def _check(check: Callable, index: int, document) -> BatchResult:
+    # A document that cannot be read, parsed, or checked fails alone, not its batch
+    source = None
+    try:
+        source = None if _is_xml(document) else os.fspath(document)
+        root = _load(document)
+        entries = list()
+        check(root, entries)
+        records = [record(entry) for entry in entries]
+        resolve_paths(records)
+    except Exception as ex:
+        logger.warning(f"Cannot check document {index}: {ex}")
+        return BatchResult(index, source, [], f"{type(ex).__name__}: {ex}")
+    return BatchResult(index, source, records, None)
+
+
+def run(
+    check: Callable, documents: Iterable, workers: int = None, ordered: bool = True, chunksize: int = 1
+) -> Iterator[BatchResult]:
+    """
+    Checks documents across worker processes
+
+    Args:
+        check: module-level function called as check(root, entries) on the model of
+            each document, appending (code, msg, node, *args) tuples to entries
+        documents: file system paths (str or os.PathLike) and/or XML content (str
+            starting with "<", or bytes)
+        workers: number of worker processes (default os.cpu_count()); 1 checks the
+            documents one after another in the calling process
+        ordered: boolean to yield results in the order of the documents rather than
+            as they are completed
+        chunksize: number of documents sent to a worker at a time when ordered
+
+    Returns:
+        Iterator of BatchResult
+    """
+    task = functools.partial(_check, check)
+    if workers == 1:
+        for index, document in enumerate(documents):
+            yield task(index, document)
+        return
+    executor = ProcessPoolExecutor(max_workers=workers)
+    try:
+        if ordered:
+            documents = list(documents)
+            yield from executor.map(task, range(len(documents)), documents, chunksize=chunksize)
+        else:
+            futures = [executor.submit(task, index, document) for index, document in enumerate(documents)]
+            for future in as_completed(futures):
+                yield future.result()
+    finally:
+        # Results that are no longer wanted are not computed
+        executor.shutdown(cancel_futures=True)
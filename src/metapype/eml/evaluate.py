@@ -13,9 +13,12 @@
 :Created:
     6/21/18
 """
+from typing import Iterable, Iterator
+
 import daiquiri
 
 from metapype.eml import names
+from metapype.model import traverse
 from metapype.model.node import Node
 from metapype.model.normalize import normalize
 from metapype.eml.evaluation_warnings import EvaluationWarning
@@ -303,7 +306,7 @@ def _responsible_party_rule(node: Node) -> list:
     for child in node.children:
         if child.name == names.USERID and child.content:
             userid = True
-            if child.attributes.get('directory') in ['http://orcid.org', 'https://orcid.org']:
+            if child.attribute_value('directory') in ['http://orcid.org', 'https://orcid.org']:
                 orcid = True
         if child.name == names.ELECTRONICMAILADDRESS and child.content:
             email = True
@@ -389,8 +392,8 @@ def node(node: Node):
 
 def tree(root: Node, warnings: list):
     """
-    Recursively walks from the root node and evaluates
-    each child node for rule compliance.
+    Walks from the root node and evaluates each node of the
+    tree for rule compliance.
 
     Args:
         root: Node instance of root for evaluation
@@ -399,11 +402,36 @@ def tree(root: Node, warnings: list):
     Returns:
         None
     """
-    evaluation = node(root)
-    if evaluation is not None:
-        warnings.extend(evaluation)
-    for child in root.children:
-        tree(child, warnings)
+    for descendant in traverse.pre_order(root):
+        evaluation = node(descendant)
+        if evaluation is not None:
+            warnings.extend(evaluation)
+
+
+def batch(
+    documents: Iterable, workers: int = None, ordered: bool = True, chunksize: int = 1
+) -> Iterator:
+    """
+    Parses and evaluates EML documents across worker processes (see tree())
+
+    Args:
+        documents: file system paths (str or os.PathLike) and/or XML content (str
+            starting with "<", or bytes)
+        workers: number of worker processes (default os.cpu_count()); 1 evaluates the
+            documents one after another in the calling process
+        ordered: boolean to yield results in the order of the documents rather than
+            as they are completed
+        chunksize: number of documents sent to a worker at a time when ordered
+
+    Returns:
+        Iterator of BatchResult, whose records are evaluation warnings as
+        ValidationErrorRecords with an EvaluationWarning code
+    """
+    # Imported here so that importing this module does not load the process pool
+    # and XML parser machinery
+    from metapype.eml import batch as _batch
+
+    return _batch.run(tree, documents, workers, ordered, chunksize)
 
 
 # Rule function pointers
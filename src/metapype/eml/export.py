@@ -13,8 +13,11 @@
 :Created:
     6/12/18
 """
+from typing import Iterator
+
 import daiquiri
 
+from metapype.model import metapype_io
 from metapype.model.node import Node
 from xml.sax.saxutils import escape, unescape
 
@@ -23,8 +26,10 @@ logger = daiquiri.getLogger("export: " + __name__)
 space = "    "
 
 
-def to_xml(node: Node, level: int = 0) -> str:
-    xml = ""
+def _xml_tags(node: Node, level: int) -> tuple:
+    """
+    Returns the XML opening (including any content) and closing text of a node
+    """
     closed = False
     boiler = (
         'xmlns:eml="https://eml.ecoinformatics.org/eml-2.2.0" '
@@ -35,9 +40,9 @@ def to_xml(node: Node, level: int = 0) -> str:
     )
     name = node.name
     attributes = ""
-    for attribute in node.attributes:
+    for attribute in node.list_attributes():
         attributes += ' {0}="{1}"'.format(
-            attribute, node.attributes[attribute]
+            attribute, node.attribute_value(attribute)
         )
     if level == 0:
         indent = ""
@@ -48,7 +53,7 @@ def to_xml(node: Node, level: int = 0) -> str:
         indent = space * level
     open_tag = "<" + name + attributes + ">"
     close_tag = "</" + name + ">"
-    xml += indent + open_tag
+    xml = indent + open_tag
     if node.content is not None:
         if isinstance(node.content, str):
             # if it hasn't been escaped already, escape it
@@ -62,14 +67,34 @@ def to_xml(node: Node, level: int = 0) -> str:
         closed = True
     elif len(node.children) > 0:
         xml += "\n"
-    for child in node.children:
-        xml += to_xml(child, level + 1)
+    end = ""
     if not closed:
         if len(node.children) > 0:
-            xml += indent
-        xml += close_tag + "\n"
+            end += indent
+        end += close_tag + "\n"
+    return xml, end
+
+
+def _xml_chunks(node: Node, level: int) -> Iterator[str]:
+    # The stack holds nodes still to be opened and the closing text of open nodes
+    stack = [(node, level)]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, str):
+            yield item
+            continue
+        node, level = item
+        xml, end = _xml_tags(node, level)
+        yield xml
+        stack.append(end)
+        stack.extend((child, level + 1) for child in reversed(node.children))
+
 
-    return xml
+def to_xml(node: Node, level: int = 0, out=None):
+    chunks = _xml_chunks(node, level)
+    if out is None:
+        return "".join(chunks)
+    metapype_io.write_chunks(chunks, out)
 
 
 def main():
@@ -29,13 +29,13 @@ from metapype.model.node import Node
 
 cwd = os.path.dirname(os.path.realpath(__file__))
 logfile = cwd + "/harness.log"
-daiquiri.setup(
-    level=logging.INFO, outputs=(daiquiri.output.File(logfile), "stdout",)
-)
 logger = daiquiri.getLogger(__name__)
 
 
 def main():
+    daiquiri.setup(
+        level=logging.INFO, outputs=(daiquiri.output.File(logfile), "stdout",)
+    )
 
     eml = Node(names.EML)
     eml.add_attribute("packageId", "edi.23.1")
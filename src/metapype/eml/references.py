@@ -15,6 +15,7 @@
 import daiquiri
 
 import metapype.eml.names as names
+from metapype.model import traverse
 from metapype.model.node import Node
 
 
@@ -23,16 +24,13 @@ logger = daiquiri.getLogger(__name__)
 
 def _register_ids(node: Node) -> dict:
     id_register = dict()
-    for a, v in node.attributes.items():
-        if a == "id":
-            id_register[v] = node
-    for child in node.children:
-        _ = _register_ids(child)
-        for k in _.keys():
+    for descendant in traverse.pre_order(node):
+        if "id" in descendant.list_attributes():
+            k = descendant.attribute_value("id")
             if k in id_register:
                 msg = f"Duplicate use of ID: '{k}'"
                 raise ValueError(msg)
-        id_register = {**id_register, **_}
+            id_register[k] = descendant
     return id_register
 
 
@@ -47,7 +45,7 @@ def expand(node: Node):
         source_node = ids[reference.content]
         destination_node = reference.parent
         destination_node.remove_child(reference)
-        Node.delete_node_instance(reference.id)
         for source_child in source_node.children:
             source_child_copy = source_child.copy()
             destination_node.add_child(source_child_copy)
+    Node.delete_node_instances(references)
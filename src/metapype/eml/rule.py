@@ -16,17 +16,13 @@
 """
 import datetime
 from datetime import time
+import functools
 import importlib.resources
 import json
+import re
 from typing import Optional
 
 import daiquiri
-from rfc3986 import uri_reference, validators
-from rfc3986.exceptions import (
-    InvalidComponentsError,
-    MissingComponentError,
-    UnpermittedComponentError
-)
 
 from metapype.eml.exceptions import (
     ChildNotAllowedError,
@@ -38,7 +34,7 @@ from metapype.eml.exceptions import (
     UnknownContentRuleError,
 )
 from metapype.eml import names
-from metapype.eml.validation_errors import ValidationError
+from metapype.eml.validation_errors import LazyMessage, ValidationError, ValidationErrorRecord
 from metapype.model.node import Node
 
 
@@ -62,18 +58,110 @@ def load_rules():
     Load rules from the JSON file into the rules dict
     """
 
-    rules = importlib.resources.read_text("metapype.eml", "rules.json")
-    _rules_dict = json.loads(rules)
+    with importlib.resources.files("metapype.eml").joinpath("rules.json").open("r", encoding="utf-8") as f:
+        _rules_dict = json.load(f)
     return _rules_dict
 
 
 rules_dict = load_rules()
 
 
+# Size of the memo of each content predicate (Rule.is_float(), Rule.is_uri(), etc.)
+CONTENT_CACHE_SIZE = 4096
+
+
+@functools.cache
+def _uri_validator() -> tuple:
+    """
+    Returns the rfc3986 uri_reference function, the URI validator, and the errors
+    raised by the validator; rfc3986 is imported on first use, since importing it
+    takes longer than loading the rules
+    """
+    from rfc3986 import uri_reference, validators
+    from rfc3986.exceptions import (
+        InvalidComponentsError,
+        MissingComponentError,
+        UnpermittedComponentError
+    )
+
+    validator = validators.Validator().allow_schemes(
+        "http", "https", "ftp"
+    ).require_presence_of(
+        "scheme", "host"
+    ).check_validity_of(
+        "scheme", "host", "path"
+    )
+    return uri_reference, validator, (InvalidComponentsError, MissingComponentError, UnpermittedComponentError)
+
+
+# Prechecks of the content predicates: a value that does not match one of the
+# _MAYBE patterns fails without being parsed, and one that matches a _SURELY
+# pattern passes without being parsed
+_MAYBE_URI = re.compile(r"^[A-Za-z][A-Za-z0-9+.\-]*:")
+_MAYBE_YEAR = re.compile(r"^\d{4}$")
+_MAYBE_DATE = re.compile(r"^\d{4}-\d{1,2}-\d{1,2}$")
+_MAYBE_TIME = re.compile(r"^T?\d")
+_SURELY_FLOAT = re.compile(r"^[+-]?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?$", re.ASCII)
+_SURELY_INT = re.compile(r"^[+-]?\d+$", re.ASCII)
+
+_content_predicates = {}
+
+
+def _memoized(predicate):
+    """
+    Memoizes a content predicate of one value in a bounded LRU cache; values that
+    cannot be hashed are not cached.
+    """
+    cached = functools.lru_cache(maxsize=CONTENT_CACHE_SIZE, typed=True)(predicate)
+
+    @functools.wraps(predicate)
+    def wrapper(val=None):
+        try:
+            return cached(val)
+        except TypeError:
+            return predicate(val)
+
+    wrapper.cache_info = cached.cache_info
+    wrapper.cache_clear = cached.cache_clear
+    _content_predicates[predicate.__name__] = wrapper
+    return wrapper
+
+
+def content_cache_info() -> dict:
+    """
+    Returns the hit and miss counters of the content predicate memos
+
+    Returns:
+        Dict of predicate name (e.g., "is_uri") to functools CacheInfo
+    """
+    return {name: predicate.cache_info() for name, predicate in _content_predicates.items()}
+
+
+def clear_content_caches() -> None:
+    for predicate in _content_predicates.values():
+        predicate.cache_clear()
+
+
+def _is_enumerated(value, allowed: frozenset) -> bool:
+    """
+    Returns True if the value is one of the allowed enumerated values; a value that
+    cannot be hashed (e.g., a list set as content) equals none of them
+    """
+    try:
+        return value in allowed
+    except TypeError:
+        return False
+
+
 class Rule(object):
     """
     The Rule class holds rule content for a specific rule as well as the logic for
     processing content validation.
+
+    A Rule instance is immutable once constructed; the state of an individual
+    validation (e.g., the position within a node's children) is kept in a
+    separate cursor object, so a single instance may be shared across threads
+    and asyncio tasks (see get_rule()).
     """
 
     def __init__(self, rule_name):
@@ -83,7 +171,18 @@ class Rule(object):
         self._children = rule_data[1]
         self._content = rule_data[2]
         self._rule_children_names = self._get_rule_children_names(self._children)
-        self._depth = 0
+        self._allowed_children = frozenset(self._rule_children_names)
+        get_compiled_children(rule_name)
+        self._is_mixed_content = rule_name in (
+            RULE_TEXT, RULE_ANYNAME, RULE_PARA, RULE_SUBSCRIPT, RULE_SUPERSCRIPT
+        )
+        # Allowed values of enumerated attributes, for membership tests
+        self._attribute_enums = {
+            attribute: frozenset(attribute_rule[1:])
+            for attribute, attribute_rule in self._attributes.items()
+            if len(attribute_rule) > 1
+        }
+        self._content_checks = self._compile_content()
 
     @staticmethod
     def child_list_node_names(child_list: list):
@@ -113,6 +212,7 @@ class Rule(object):
         return max_occurrences
 
     @staticmethod
+    @_memoized
     def is_float(val: str = None):
         """
         Boolean to determine whether node content is
@@ -121,6 +221,8 @@ class Rule(object):
         is_valid = False
         if val is None:
             return False
+        if type(val) is str and _SURELY_FLOAT.match(val):
+            return True
         try:
             __ = float(val)
             is_valid = True
@@ -129,6 +231,7 @@ class Rule(object):
         return is_valid
 
     @staticmethod
+    @_memoized
     def is_int(val: str = None):
         """
         Boolean to determine whether node content is
@@ -136,6 +239,8 @@ class Rule(object):
         """
         is_valid = False
         if val:
+            if type(val) is str and _SURELY_INT.match(val):
+                return True
             try:
                 __ = int(val)
                 is_valid = True
@@ -144,22 +249,28 @@ class Rule(object):
         return is_valid
 
     @staticmethod
+    @_memoized
     def is_yeardate(val: str = None):
         """
         Boolean to determine whether node content is a valid yearDate value.
         """
         is_valid = False
         if val and type(val) is str:
-            for yeardate_format in ["%Y", "%Y-%m-%d"]:
-                try:
-                    datetime.datetime.strptime(val, yeardate_format)
-                    is_valid = True
-                    break
-                except ValueError as ex:
-                    logger.debug(ex)
+            if _MAYBE_YEAR.match(val):
+                yeardate_format = "%Y"
+            elif _MAYBE_DATE.match(val):
+                yeardate_format = "%Y-%m-%d"
+            else:
+                return False
+            try:
+                datetime.datetime.strptime(val, yeardate_format)
+                is_valid = True
+            except ValueError as ex:
+                logger.debug(ex)
         return is_valid
 
     @staticmethod
+    @_memoized
     def is_uri(val: str = None) -> bool:
         """
         Boolean to determine whether node content is a valid uri.
@@ -170,28 +281,27 @@ class Rule(object):
 
         """
         is_valid = False
-        validator = validators.Validator().allow_schemes(
-            "http", "https", "ftp"
-        ).require_presence_of(
-            "scheme", "host"
-        ).check_validity_of(
-            "scheme", "host", "path"
-        )
+        if type(val) is str and not _MAYBE_URI.match(val):
+            return False
+        uri_reference, validator, errors = _uri_validator()
         uri = uri_reference(val)
         try:
             validator.validate(uri)
             is_valid = True
-        except (InvalidComponentsError, MissingComponentError, UnpermittedComponentError) as ex:
+        except errors as ex:
             logger.debug(ex)
         return is_valid
 
     @staticmethod
+    @_memoized
     def is_time(val: str = None):
         """
         Boolean to determine whether node content is a valid time value.
         """
         is_valid = False
         if val and type(val) is str:
+            if not _MAYBE_TIME.match(val):
+                return False
             try:
                 time.fromisoformat(val)
                 is_valid = True
@@ -250,7 +360,7 @@ class Rule(object):
             raise Exception(f"Unknown attribute {attribute}")
 
     def is_allowed_child(self, child_name: str):
-        return child_name in self._rule_children_names
+        return child_name in self._allowed_children
 
     def allowed_attribute_values(self, attribute: str):
         values = []
@@ -264,6 +374,35 @@ class Rule(object):
     def has_enum_content(self):
         return "content_enum" in self._content
 
+    def _compile_content(self) -> tuple:
+        """
+        Resolves the content rules (and any content enumeration) of this rule into a
+        tuple of validators, each called as validator(node, errs)
+        """
+        checks = []
+        for content_rule in self._content["content_rules"]:
+            if content_rule == "anyContent":
+                continue
+            elif content_rule == "nonEmptyContent":
+                is_mixed_content = self._is_mixed_content
+                checks.append(
+                    lambda node, errs: Rule._validate_non_empty_content(node, is_mixed_content, errs)
+                )
+            elif content_rule in _CONTENT_VALIDATORS:
+                checks.append(getattr(self, _CONTENT_VALIDATORS[content_rule]))
+            else:
+                checks.append(functools.partial(Rule._validate_unknown_content_rule, content_rule))
+        if self.has_enum_content():
+            enum_values = self._content["content_enum"]
+            allowed = frozenset(enum_values)
+
+            def check_enum(node: Node, errs: list = None):
+                if not _is_enumerated(node.content, allowed):
+                    Rule._validate_enum_content(node, enum_values, errs)
+
+            checks.append(check_enum)
+        return tuple(checks)
+
     def validate_rule(self, node: Node, errs: list = None):
         """
         Validates a node for rule compliance by validating the node's
@@ -279,24 +418,23 @@ class Rule(object):
         Raises:
             MetapypeRuleError: Illegal attribute or missing required attribute
         """
-        if self.name in (RULE_TEXT, RULE_ANYNAME, RULE_PARA, RULE_SUBSCRIPT, RULE_SUPERSCRIPT):
-            is_mixed_content = True
-        else:
-            is_mixed_content = False
-
-        self._validate_content(node, is_mixed_content, errs)
+        for check in self._content_checks:
+            check(node, errs)
         self._validate_attributes(node, errs)
-        self._validate_children(node, is_mixed_content, errs)
+        self._validate_children(node, self._is_mixed_content, errs)
 
     def _validate_content(self, node: Node, is_mixed_content: bool, errs: list = None):
         """
         Validates node content for rule compliance.
         For each of the content rules configured for this rule,
         validates the node to see if its content complies
-        with the content that this rule expects.
+        with the content that this rule expects. The content rules
+        are resolved to validators once, when the rule is loaded.
 
         Args:
             node: Node instance to be validated
+            is_mixed_content: not used; whether a rule allows mixed content
+                is resolved with its content rules
 
         Returns:
             None
@@ -304,57 +442,32 @@ class Rule(object):
         Raises:
             MetapypeRuleError: Illegal attribute or missing required attribute
         """
-        for content_rule in self._content["content_rules"]:
-            if content_rule == "emptyContent":
-                self._validate_empty_content(node, errs)
-            elif content_rule == "floatContent":
-                self._validate_float_content(node, errs)
-            elif content_rule == "floatRangeContent_EW":
-                self._validate_float_range_ew_content(node, errs)
-            elif content_rule == "floatRangeContent_NS":
-                self._validate_float_range_ns_content(node, errs)
-            elif content_rule == "floatContent_Nonnegative":
-                self._validate_float_content_nonnegative(node, errs)
-            elif content_rule == "intContent":
-                self._validate_int_content(node, errs)
-            elif content_rule == "nonEmptyContent":
-                self._validate_non_empty_content(node, is_mixed_content, errs)
-            elif content_rule == "strContent":
-                self._validate_str_content(node, errs)
-            elif content_rule == "timeContent":
-                self._validate_time_content(node, errs)
-            elif content_rule == 'uriContent':
-                self._validate_uri_content(node, errs)
-            elif content_rule == "yearDateContent":
-                self._validate_yeardate_content(node, errs)
-            elif content_rule == "anyContent":
-                pass
-            else:
-                msg = f"Node {node.name} content type rule {content_rule} not recognized"
-                if errs is None:
-                    raise UnknownContentRuleError(msg)
-                else:
-                    errs.append(
-                        (
-                            ValidationError.UNKNOWN_CONTENT_RULE,
-                            msg,
-                            node,
-                        )
-                    )
+        for check in self._content_checks:
+            check(node, errs)
 
-        if self.has_enum_content():
-            enum_values = self._content["content_enum"]
-            self._validate_enum_content(node, enum_values, errs)
+    @staticmethod
+    def _validate_unknown_content_rule(content_rule: str, node: Node, errs: list = None):
+        msg = LazyMessage("Node {} content type rule {} not recognized", node.name, content_rule)
+        if errs is None:
+            raise UnknownContentRuleError(str(msg))
+        else:
+            errs.append(
+                ValidationErrorRecord(
+                    ValidationError.UNKNOWN_CONTENT_RULE,
+                    msg,
+                    node,
+                )
+            )
 
     @staticmethod
     def _validate_empty_content(node: Node, errs: list = None):
         if node.content is not None:
-            msg = f'Node "{node.name}" content should be empty'
+            msg = LazyMessage('Node "{}" content should be empty', node.name)
             if errs is None:
-                raise MetapypeRuleError(msg)
+                raise MetapypeRuleError(str(msg))
             else:
                 errs.append(
-                    (
+                    ValidationErrorRecord(
                         ValidationError.CONTENT_EXPECTED_EMPTY,
                         msg,
                         node,
@@ -367,12 +480,14 @@ class Rule(object):
         node: Node, enum_values: list, errs: list = None
     ):
         if node.content not in enum_values:
-            msg = f'Node "{node.name}" content should be one of "{enum_values}", not "{node.content}"'
+            msg = LazyMessage(
+                'Node "{}" content should be one of "{}", not "{}"', node.name, enum_values, node.content
+            )
             if errs is None:
-                raise MetapypeRuleError(msg)
+                raise MetapypeRuleError(str(msg))
             else:
                 errs.append(
-                    (
+                    ValidationErrorRecord(
                         ValidationError.CONTENT_EXPECTED_ENUM,
                         msg,
                         node,
@@ -385,12 +500,14 @@ class Rule(object):
     def _validate_int_content(node: Node, errs: list = None):
         val = node.content
         if val is not None and not Rule.is_int(val):
-            msg = f'Node "{node.name}" content should be type "{TYPE_INT}", not "{type(node.content)}"'
+            msg = LazyMessage(
+                'Node "{}" content should be type "{}", not "{}"', node.name, TYPE_INT, type(node.content)
+            )
             if errs is None:
-                raise MetapypeRuleError(msg)
+                raise MetapypeRuleError(str(msg))
             else:
                 errs.append(
-                    (
+                    ValidationErrorRecord(
                         ValidationError.CONTENT_EXPECTED_INT,
                         msg,
                         node,
@@ -402,12 +519,14 @@ class Rule(object):
     def _validate_float_content(node: Node, errs: list = None):
         val = node.content
         if val is not None and not Rule.is_float(val):
-            msg = f'Node "{node.name}" content should be type "{TYPE_FLOAT}", not "{type(node.content)}"'
+            msg = LazyMessage(
+                'Node "{}" content should be type "{}", not "{}"', node.name, TYPE_FLOAT, type(node.content)
+            )
             if errs is None:
-                raise MetapypeRuleError(msg)
+                raise MetapypeRuleError(str(msg))
             else:
                 errs.append(
-                    (
+                    ValidationErrorRecord(
                         ValidationError.CONTENT_EXPECTED_FLOAT,
                         msg,
                         node,
@@ -417,14 +536,16 @@ class Rule(object):
 
     def _validate_float_range_content(self, node: Node, minmax, errs: list = None):
         self._validate_float_content(node, errs)
+        if not Rule.is_float(node.content):
+            return
         float_val = float(node.content)
         if float_val < minmax[0] or float_val > minmax[1]:
-            msg = f'Node "{node.name}" content should be in range {minmax}'
+            msg = LazyMessage('Node "{}" content should be in range {}', node.name, minmax)
             if errs is None:
-                raise MetapypeRuleError(msg)
+                raise MetapypeRuleError(str(msg))
             else:
                 errs.append(
-                    (
+                    ValidationErrorRecord(
                         ValidationError.CONTENT_EXPECTED_RANGE,
                         msg,
                         node,
@@ -438,14 +559,16 @@ class Rule(object):
         self, node: Node, errs: list = None
     ):
         self._validate_float_content(node, errs)
+        if not Rule.is_float(node.content):
+            return
         float_val = float(node.content)
         if float_val < 0:
-            msg = f'Node "{node.name}" content should be non-negative'
+            msg = LazyMessage('Node "{}" content should be non-negative', node.name)
             if errs is None:
-                raise MetapypeRuleError(msg)
+                raise MetapypeRuleError(str(msg))
             else:
                 errs.append(
-                    (
+                    ValidationErrorRecord(
                         ValidationError.CONTENT_EXPECTED_RANGE,
                         msg,
                         node,
@@ -468,39 +591,41 @@ class Rule(object):
     def _validate_non_empty_content(node: Node, is_mixed_content: bool, errs: list = None):
         if node.content is None or not str(node.content).strip():  # If purely whitespace, it's considered empty
             if (is_mixed_content and len(node.children) == 0) or not is_mixed_content:
-                msg = f'Node "{node.name}" content should not be empty or entirely whitespace'
+                msg = LazyMessage('Node "{}" content should not be empty or entirely whitespace', node.name)
                 if errs is None:
-                    raise MetapypeRuleError(msg)
+                    raise MetapypeRuleError(str(msg))
                 else:
                     errs.append(
-                        (ValidationError.CONTENT_EXPECTED_NONEMPTY, msg, node)
+                        ValidationErrorRecord(ValidationError.CONTENT_EXPECTED_NONEMPTY, msg, node)
                     )
 
     @staticmethod
     def _validate_str_content(node: Node, errs: list = None):
         if node.content is not None and type(node.content) is not str:
-            msg = f'Node "{node.name}" content should be type "{TYPE_STR}", not "{type(node.content)}"'
+            msg = LazyMessage(
+                'Node "{}" content should be type "{}", not "{}"', node.name, TYPE_STR, type(node.content)
+            )
             if errs is None:
-                raise MetapypeRuleError(msg)
+                raise MetapypeRuleError(str(msg))
             else:
                 errs.append(
-                    (
+                    ValidationErrorRecord(
                         ValidationError.CONTENT_EXPECTED_STRING,
                         msg,
                         node,
                         type(node.content),
                     )
                 )
-        if node.content is not None:
+        elif node.content is not None:
             try:
                 node.content.encode(encoding="utf-8", errors="strict")
             except UnicodeError as ex:
-                msg = f'Node "{node.name}" content contains non-unicode character(s)'
+                msg = LazyMessage('Node "{}" content contains non-unicode character(s)', node.name)
                 if errs is None:
-                    raise StrContentUnicodeError(msg)
+                    raise StrContentUnicodeError(str(msg))
                 else:
                     errs.append(
-                        (
+                        ValidationErrorRecord(
                             ValidationError.CONTENT_EXPECTED_STRING,
                             msg,
                             node,
@@ -512,12 +637,12 @@ class Rule(object):
     def _validate_time_content(node: Node, errs: list = None):
         val = node.content
         if val is not None and not Rule.is_time(val):
-            msg = f'Node "{node.name}" format should be time ("HH:MM:SS" or "HH:MM:SS.f")'
+            msg = LazyMessage('Node "{}" format should be time ("HH:MM:SS" or "HH:MM:SS.f")', node.name)
             if errs is None:
-                raise MetapypeRuleError(msg)
+                raise MetapypeRuleError(str(msg))
             else:
                 errs.append(
-                    (
+                    ValidationErrorRecord(
                         ValidationError.CONTENT_EXPECTED_TIME_FORMAT,
                         msg,
                         node,
@@ -529,12 +654,12 @@ class Rule(object):
     def _validate_uri_content(node: Node, errs: list = None):
         uri = node.content
         if uri is not None and not Rule.is_uri(uri):
-            msg = f'Node "{node.name}" uri content "{uri}" is not valid'
+            msg = LazyMessage('Node "{}" uri content "{}" is not valid', node.name, uri)
             if errs is None:
-                raise ContentExpectedUriError(msg)
+                raise ContentExpectedUriError(str(msg))
             else:
                 errs.append(
-                    (
+                    ValidationErrorRecord(
                         ValidationError.CONTENT_EXPECTED_URI,
                         msg,
                         node,
@@ -546,12 +671,12 @@ class Rule(object):
     def _validate_yeardate_content(node: Node, errs: list = None):
         val = node.content
         if val is not None and not Rule.is_yeardate(val):
-            msg = f'Node "{node.name}" format should be year ("YYYY") or date ("YYYY-MM-DD")'
+            msg = LazyMessage('Node "{}" format should be year ("YYYY") or date ("YYYY-MM-DD")', node.name)
             if errs is None:
-                raise MetapypeRuleError(msg)
+                raise MetapypeRuleError(str(msg))
             else:
                 errs.append(
-                    (
+                    ValidationErrorRecord(
                         ValidationError.CONTENT_EXPECTED_YEAR_FORMAT,
                         msg,
                         node,
@@ -575,31 +700,32 @@ class Rule(object):
         Raises:
             MetapypeRuleError: Illegal attribute or missing required attribute
         """
+        node_attributes = node.list_attributes()
         for attribute in self._attributes:
             required = self._attributes[attribute][0]
             # Test for required attributes
-            if required and attribute not in node.attributes:
-                msg = f'"{attribute}" is a required attribute of node "{node.name}"'
+            if required and attribute not in node_attributes:
+                msg = LazyMessage('"{}" is a required attribute of node "{}"', attribute, node.name)
                 if errs is None:
-                    raise MetapypeRuleError(msg)
+                    raise MetapypeRuleError(str(msg))
                 else:
                     errs.append(
-                        (
+                        ValidationErrorRecord(
                             ValidationError.ATTRIBUTE_REQUIRED,
                             msg,
                             node,
                             attribute,
                         )
                     )
-        for attribute in node.attributes:
+        for attribute in node_attributes:
             # Test for non-allowed attribute
             if attribute not in self._attributes:
-                msg = f'"{attribute}" is not a recognized attribute of node "{node.name}"'
+                msg = LazyMessage('"{}" is not a recognized attribute of node "{}"', attribute, node.name)
                 if errs is None:
-                    raise MetapypeRuleError(msg)
+                    raise MetapypeRuleError(str(msg))
                 else:
                     errs.append(
-                        (
+                        ValidationErrorRecord(
                             ValidationError.ATTRIBUTE_UNRECOGNIZED,
                             msg,
                             node,
@@ -608,17 +734,20 @@ class Rule(object):
                     )
             else:
                 # Test for enumerated list of allowed values
-                if (
-                    len(self._attributes[attribute]) > 1
-                    and node.attributes[attribute]
-                    not in self._attributes[attribute][1:]
+                if attribute in self._attribute_enums and not _is_enumerated(
+                    node.attribute_value(attribute), self._attribute_enums[attribute]
                 ):
-                    msg = f'Node "{node.name}" attribute "{attribute}" must be one of the following: "{self._attributes[attribute][1:]}"'
+                    msg = LazyMessage(
+                        'Node "{}" attribute "{}" must be one of the following: "{}"',
+                        node.name,
+                        attribute,
+                        self._attributes[attribute][1:],
+                    )
                     if errs is None:
-                        raise MetapypeRuleError(msg)
+                        raise MetapypeRuleError(str(msg))
                     else:
                         errs.append(
-                            (
+                            ValidationErrorRecord(
                                 ValidationError.ATTRIBUTE_EXPECTED_ENUM,
                                 msg,
                                 node,
@@ -633,8 +762,8 @@ class Rule(object):
 
         1. Ignores validation of children if parent node is "metadata"
         2. Ensures children are valid for node
-        3. Iterates through the list children rules and validates whether
-           the node instance complies with the rules.
+        3. Matches the sequence of node children names against the compiled
+           children rules of this rule (see compile_children()).
 
         Returns:
             None
@@ -643,169 +772,26 @@ class Rule(object):
             MetapypeRuleError: Illegal child, bad sequence or choice, missing
             child, or wrong child cardinality
         """
-        self._node = node
-        self._node_children_names = []
-        self._node_index = 0
-
-        if self._node.name == names.METADATA:
+        if node.name == names.METADATA:
             # Metadata nodes may contain any type of child node, but only one such node
-            if len(self._node.children) > 1:
+            if len(node.children) > 1:
                 msg = f"Maximum occurrence of 1 child exceeded in parent '{names.METADATA}'"
                 if errs is None:
                     raise MaxOccurrenceExceededError(msg)
                 else:
-                    errs.append((ValidationError.MAX_OCCURRENCE_EXCEEDED, msg, self._node))
-
+                    errs.append(ValidationErrorRecord(ValidationError.MAX_OCCURRENCE_EXCEEDED, msg, node))
         else:
-            for node_child in self._node.children:
-                self._node_children_names.append(node_child.name)
-
-            # Test for non-valid children
-            for node_child_name in self._node_children_names:
-                if not self.is_allowed_child(node_child_name):
-                    msg = f"Child '{node_child_name}' not allowed in parent '{self._node.name}'"
-                    if errs is None:
-                        raise ChildNotAllowedError(msg)
-                    else:
-                        errs.append((ValidationError.CHILD_NOT_ALLOWED, msg, self._node, node_child_name))
-
-            if len(self._children) > 0:
-                # Begin validation of children
-                modality = Rule._get_children_modality(self._children)
-                if modality == "sequence":
-                    self._validate_sequence(self._children, is_mixed_content, errs)
-                else:
-                    self._validate_choice(self._children, is_mixed_content, errs)
-
-            if self._node_index != len(self._node_children_names):
-                msg = (
-                    f"Child '{self._node_children_names[self._node_index]}' "
-                    f"is not allowed in this position for parent '{self._node.name}'"
-                )
-                if errs is None:
-                    raise ChildNotAllowedError(msg)
-                else:
-                    errs.append(
-                        (
-                            ValidationError.CHILD_NOT_ALLOWED,
-                            msg,
-                            self._node,
-                            self._node_children_names[self._node_index],
-                        )
-                    )
-
-    def _validate_sequence(self, rule_children: list, is_mixed_content: bool, errs: list = None):
-        for rule_child in rule_children:
-            if Rule._get_children_modality(rule_child) == "choice":
-                self._validate_choice(rule_child, is_mixed_content, errs)
-            else:
-                self._validate_rule_child(rule_child, False, errs)
-
-    def _validate_choice(self, rule_children: list, is_mixed_content: bool, errs: list = None):
-        choice_min = rule_children[-2]
-        choice_max = rule_children[-1]
-        choice_occurrence = 0
-
-        while (
-                self._node_index < len(self._node_children_names) and
-                self._node_children_names[self._node_index] in self._get_rule_children_names(rule_children)
-        ):
-            for rule_child in rule_children[:-2]:
-                if self._node_index == len(self._node_children_names):
-                    break
-                modality = Rule._get_children_modality(rule_child)
-                if modality == "sequence":
-                    if self._node_children_names[self._node_index] in self._get_rule_children_names(rule_child):
-                        self._validate_sequence(rule_child, is_mixed_content, errs)
-                        choice_occurrence += 1
-                elif modality == "choice":
-                    if self._node_children_names[self._node_index] in self._get_rule_children_names(rule_child):
-                        self._validate_choice(rule_child, is_mixed_content, errs)
-                        choice_occurrence += 1
-                else:
-                    if self._node_children_names[self._node_index] == rule_child[0]:
-                        self._validate_rule_child(rule_child, True, errs)
-                        choice_occurrence += 1
-        if choice_max is not INFINITY and choice_occurrence > choice_max:
-            msg = f"Maximum occurrence of '{choice_max}' exceeded for choice in parent '{self._node.name}'"
-            if errs is None:
-                raise MaxOccurrenceExceededError(msg)
-            else:
-                errs.append(
-                    (
-                        ValidationError.MAX_CHOICE_EXCEEDED,
-                        msg,
-                        self._node,
-                        self._node.name,
-                        choice_max,
-                    )
-                )
-        if choice_occurrence < choice_min and not is_mixed_content:
-            msg = f"Minimum occurrence of '{choice_min}' not met for choice in parent '{self._node.name}'"
-            if errs is None:
-                raise MinOccurrenceUnmetError(msg)
-            else:
-                errs.append(
-                    (
-                        ValidationError.MIN_CHOICE_UNMET,
-                        msg,
-                        self._node,
-                        self._node.name,
-                        choice_min,
-                    )
-                )
-
-    def _validate_rule_child(self, rule_child: list, limit_max: bool, errs: list = None):
-        rule_child_name = rule_child[0]
-        rule_child_min = rule_child[-2]
-        rule_child_max = rule_child[-1]
-        occurrence = 0
-        while (
-                self._node_index < len(self._node_children_names) and
-                rule_child_name == self._node_children_names[self._node_index]
-        ):
-            occurrence += 1
-            self._node_index += 1
-            if limit_max and occurrence == rule_child_max:
-                return None
-            if rule_child_max is not INFINITY and occurrence > rule_child_max:
-                msg = (
-                    f"Maximum occurrence of '{rule_child_max}' "
-                    f"exceeded for child '{self._node_children_names[self._node_index]}' in parent "
-                    f"'{self._node.name}'"
-                )
+            outcome = _match_children(
+                self._name,
+                node.name,
+                tuple(node_child.name for node_child in node.children),
+                is_mixed_content
+            )
+            for error, code, msg, args in outcome:
                 if errs is None:
-                    raise MaxOccurrenceExceededError(msg)
+                    raise error(msg)
                 else:
-                    errs.append(
-                        (
-                            ValidationError.MAX_OCCURRENCE_EXCEEDED,
-                            msg,
-                            self._node,
-                            None if self._node_index >= len(self._node_children_names)
-                            else self._node_children_names[self._node_index],
-                            rule_child_max,
-                        )
-                    )
-        if occurrence < rule_child_min:
-            msg = (
-                f"Minimum occurrence of '{rule_child_min}' "
-                f"not met for child '{rule_child_name}' in parent '{self._node.name}'"
-            )
-            if errs is None:
-                raise MinOccurrenceUnmetError(msg)
-            else:
-                errs.append(
-                    (
-                        ValidationError.MIN_OCCURRENCE_UNMET,
-                        msg,
-                        self._node,
-                        rule_child_name,
-                        # None if self._node_index >= len(self._node_children_names)
-                        # else self._node_children_names[self._node_index],
-                        rule_child_min,
-                    )
-                )
+                    errs.append(ValidationErrorRecord(code, msg, node, *args))
 
     @staticmethod
     def _get_children_modality(rule_children: list) -> str:
@@ -882,6 +868,218 @@ class Rule(object):
             return []
 
 
+# Compiled children rules: the nested list grammar of rules.json is compiled once
+# per rule into nested tuples with the modality and the set of child names
+# reachable from each group resolved up front, as follows:
+#   (CHILD, name, min, max)
+#   (SEQUENCE, (item, ...), frozenset(names))
+#   (CHOICE, (item, ...), frozenset(names), min, max)
+CHILD = 0
+SEQUENCE = 1
+CHOICE = 2
+
+_compiled_children = {}
+
+
+def compile_children(rule_children: list) -> Optional[tuple]:
+    """
+    Compiles the children section of a rule into its tuple form; returns None if
+    the rule does not allow children.
+
+    Args:
+        rule_children: Children section of a rule as declared in rules.json
+
+    Returns:
+        tuple: Compiled children rules
+
+    Raises:
+        MetapypeRuleError: Unsupported children rule structure
+    """
+    if len(rule_children) == 0:
+        return None
+    modality = Rule._get_children_modality(rule_children)
+    if modality == "child_rule":
+        return CHILD, rule_children[0], rule_children[-2], rule_children[-1]
+    children_names = frozenset(Rule._get_rule_children_names(rule_children))
+    if modality == "sequence":
+        items = []
+        for rule_child in rule_children:
+            if Rule._get_children_modality(rule_child) == "sequence":
+                msg = f"Sequence may not directly contain a sequence: {rule_child}"
+                raise MetapypeRuleError(msg)
+            items.append(compile_children(rule_child))
+        return SEQUENCE, tuple(items), children_names
+    items = tuple(compile_children(rule_child) for rule_child in rule_children[:-2])
+    return CHOICE, items, children_names, rule_children[-2], rule_children[-1]
+
+
+def get_compiled_children(rule_name: str) -> Optional[tuple]:
+    """
+    Helper function.
+    For a given rule name, return its compiled children rules, compiling them on
+    first use
+    """
+    try:
+        return _compiled_children[rule_name]
+    except KeyError:
+        compiled = compile_children(rules_dict[rule_name][1])
+        _compiled_children[rule_name] = compiled
+        return compiled
+
+
+class _ChildrenCursor(object):
+    """
+    Cursor state for matching the children names of a single node against the
+    compiled children rules of its rule. A new cursor is created for every match,
+    which keeps the shared Rule instances reentrant.
+    """
+
+    __slots__ = ("parent_name", "children_names", "index", "is_mixed_content", "outcome")
+
+    def __init__(self, parent_name: str, children_names: tuple, is_mixed_content: bool):
+        self.parent_name = parent_name
+        self.children_names = children_names
+        self.index = 0
+        self.is_mixed_content = is_mixed_content
+        self.outcome = []
+
+
+@functools.lru_cache(maxsize=4096)
+def _match_children(rule_name: str, parent_name: str, children_names: tuple, is_mixed_content: bool) -> tuple:
+    """
+    Matches the children names of a parent node against the compiled children rules
+    of the parent's rule. The outcome depends only on the arguments, so it is memoized
+    for the (very common) case of many nodes sharing the same shape.
+
+    Returns:
+        tuple: (exception class, ValidationError, message, args) for each rule failure,
+               in the order they are encountered
+    """
+    compiled = get_compiled_children(rule_name)
+    cursor = _ChildrenCursor(parent_name, children_names, is_mixed_content)
+    allowed_names = frozenset() if compiled is None else (
+        frozenset((compiled[1],)) if compiled[0] == CHILD else compiled[2]
+    )
+
+    # Test for non-valid children
+    for child_name in children_names:
+        if child_name not in allowed_names:
+            msg = f"Child '{child_name}' not allowed in parent '{parent_name}'"
+            cursor.outcome.append(
+                (ChildNotAllowedError, ValidationError.CHILD_NOT_ALLOWED, msg, (child_name,))
+            )
+
+    if compiled is not None:
+        # Begin validation of children
+        if compiled[0] == SEQUENCE:
+            _match_sequence(cursor, compiled)
+        else:
+            _match_choice(cursor, compiled)
+
+    if cursor.index != len(children_names):
+        child_name = children_names[cursor.index]
+        msg = (
+            f"Child '{child_name}' "
+            f"is not allowed in this position for parent '{parent_name}'"
+        )
+        cursor.outcome.append(
+            (ChildNotAllowedError, ValidationError.CHILD_NOT_ALLOWED, msg, (child_name,))
+        )
+    return tuple(cursor.outcome)
+
+
+def _match_sequence(cursor: _ChildrenCursor, sequence: tuple):
+    for item in sequence[1]:
+        if item[0] == CHOICE:
+            _match_choice(cursor, item)
+        else:
+            _match_child(cursor, item, False)
+
+
+def _match_choice(cursor: _ChildrenCursor, choice: tuple):
+    _, items, choice_names, choice_min, choice_max = choice
+    children_names = cursor.children_names
+    count = len(children_names)
+    choice_occurrence = 0
+
+    while cursor.index < count and children_names[cursor.index] in choice_names:
+        for item in items:
+            if cursor.index == count:
+                break
+            kind = item[0]
+            if kind == SEQUENCE:
+                if children_names[cursor.index] in item[2]:
+                    _match_sequence(cursor, item)
+                    choice_occurrence += 1
+            elif kind == CHOICE:
+                if children_names[cursor.index] in item[2]:
+                    _match_choice(cursor, item)
+                    choice_occurrence += 1
+            else:
+                if children_names[cursor.index] == item[1]:
+                    _match_child(cursor, item, True)
+                    choice_occurrence += 1
+    if choice_max is not INFINITY and choice_occurrence > choice_max:
+        msg = f"Maximum occurrence of '{choice_max}' exceeded for choice in parent '{cursor.parent_name}'"
+        cursor.outcome.append(
+            (
+                MaxOccurrenceExceededError,
+                ValidationError.MAX_CHOICE_EXCEEDED,
+                msg,
+                (cursor.parent_name, choice_max),
+            )
+        )
+    if choice_occurrence < choice_min and not cursor.is_mixed_content:
+        msg = f"Minimum occurrence of '{choice_min}' not met for choice in parent '{cursor.parent_name}'"
+        cursor.outcome.append(
+            (
+                MinOccurrenceUnmetError,
+                ValidationError.MIN_CHOICE_UNMET,
+                msg,
+                (cursor.parent_name, choice_min),
+            )
+        )
+
+
+def _match_child(cursor: _ChildrenCursor, rule_child: tuple, limit_max: bool):
+    _, rule_child_name, rule_child_min, rule_child_max = rule_child
+    children_names = cursor.children_names
+    count = len(children_names)
+    occurrence = 0
+    while cursor.index < count and rule_child_name == children_names[cursor.index]:
+        occurrence += 1
+        cursor.index += 1
+        if limit_max and occurrence == rule_child_max:
+            return None
+        if rule_child_max is not INFINITY and occurrence > rule_child_max:
+            msg = (
+                f"Maximum occurrence of '{rule_child_max}' "
+                f"exceeded for child '{rule_child_name}' in parent "
+                f"'{cursor.parent_name}'"
+            )
+            cursor.outcome.append(
+                (
+                    MaxOccurrenceExceededError,
+                    ValidationError.MAX_OCCURRENCE_EXCEEDED,
+                    msg,
+                    (rule_child_name, rule_child_max),
+                )
+            )
+    if occurrence < rule_child_min:
+        msg = (
+            f"Minimum occurrence of '{rule_child_min}' "
+            f"not met for child '{rule_child_name}' in parent '{cursor.parent_name}'"
+        )
+        cursor.outcome.append(
+            (
+                MinOccurrenceUnmetError,
+                ValidationError.MIN_OCCURRENCE_UNMET,
+                msg,
+                (rule_child_name, rule_child_min),
+            )
+        )
+
+
 # Named constants for EML metadata rules
 RULE_ACCESS = "accessRule"
 RULE_ACCURACY = "accuracyRule"
@@ -996,6 +1194,26 @@ RULE_VALUEURI = "valueUriRule"
 RULE_YEARDATE = "yearDateRule"
 
 
+# Content rule names and the Rule methods that validate them as method(node, errs);
+# "anyContent" and "nonEmptyContent" are resolved in Rule._compile_content()
+_CONTENT_VALIDATORS = {
+    "emptyContent": "_validate_empty_content",
+    "floatContent": "_validate_float_content",
+    "floatRangeContent_EW": "_validate_float_range_ew_content",
+    "floatRangeContent_NS": "_validate_float_range_ns_content",
+    "floatContent_Nonnegative": "_validate_float_content_nonnegative",
+    "intContent": "_validate_int_content",
+    "strContent": "_validate_str_content",
+    "timeContent": "_validate_time_content",
+    "uriContent": "_validate_uri_content",
+    "yearDateContent": "_validate_yeardate_content",
+}
+
+
+# Shared Rule instances, keyed by rule name (see get_rule())
+_rule_registry = {}
+
+
 # Maps node names to their corresponding metadata rule names
 node_mappings = {
     names.ABSTRACT: RULE_TEXT,
@@ -1248,7 +1466,12 @@ def get_rule_name(node_name: str):
 def get_rule(node_name: str):
     """
     Helper function.
-    For a given node name, instantiate its corresponding rule object and return it
+    For a given node name, return its corresponding rule object. Rule objects
+    hold no per-validation state, so each rule is instantiated once per process
+    and shared by all callers (including concurrent threads and tasks).
     """
     rule_name = get_rule_name(node_name)
-    return Rule(rule_name)
+    try:
+        return _rule_registry[rule_name]
+    except KeyError:
+        return _rule_registry.setdefault(rule_name, Rule(rule_name))
@@ -13,11 +13,18 @@
 :Created:
     7/10/18
 """
+import functools
+from typing import Iterable, Iterator
+
 import daiquiri
 
+from metapype.eml import names
 from metapype.eml import rule
 from metapype.eml.exceptions import MetapypeRuleError, UnknownNodeError, ChildNotAllowedError
-from metapype.eml.validation_errors import ValidationError
+from metapype.eml.validation_errors import LazyMessage, ValidationError, ValidationErrorRecord
+from metapype.eml.validation_errors import resolve_paths, share_paths
+from metapype.model import changes
+from metapype.model import traverse
 from metapype.model.node import Node
 
 
@@ -38,24 +45,69 @@ def node(n: Node, errs: list = None) -> None:
     Raises:
         MetapypeRuleError: An unknown type of node for EML
     """
+    start = len(errs) if errs is not None else 0
+    _node(n, errs)
+    if errs is not None:
+        share_paths(errs[start:])
+
+
+def _node(n: Node, errs: list = None) -> None:
     if n.name not in rule.node_mappings:
-        msg = f"Unknown node rule type: {n.name}"
+        msg = LazyMessage("Unknown node rule type: {}", n.name)
         if errs is None:
-            raise UnknownNodeError(msg)
+            raise UnknownNodeError(str(msg))
         else:
-            errs.append((ValidationError.UNKNOWN_NODE, msg, n))
+            errs.append(ValidationErrorRecord(ValidationError.UNKNOWN_NODE, msg, n))
     else:
         node_rule = rule.get_rule(n.name)
         node_rule.validate_rule(n, errs)
 
 
+def _prune_node(n: Node, pruned: list) -> bool:
+    """
+    Validates the node and prunes it from its parent if it is unknown, or prunes
+    its non-allowed children.
+
+    Returns: True if the node itself was pruned
+    """
+    try:
+        node(n)
+    except UnknownNodeError as ex:
+        logger.debug(f"Pruning: {n.name}")
+        pruned.append((n, str(ex)))
+        if n.parent is not None:
+            n.parent.remove_child(n)
+        return True
+    except ChildNotAllowedError as ex:
+        r = rule.get_rule(n.name)
+        children = n.children.copy()
+        for child in children:
+            if not r.is_allowed_child(child.name):
+                logger.debug(f"Pruning: {child.name}")
+                pruned.append((child, str(ex)))
+                n.remove_child(child)
+    except MetapypeRuleError as ex:
+        logger.debug(ex)
+    return False
+
+
+def _prune_strict(parent: Node, child: Node, pruned: list):
+    try:
+        node(child)
+    except MetapypeRuleError as ex:
+        logger.debug(f"Pruning: {child.name}")
+        pruned.append((child, str(ex)))
+        parent.remove_child(child)
+
+
 def prune(n: Node, strict: bool = False) -> list:
     """
     Prune in place all non-valid nodes from the tree
 
     Args:
         n: Node
-        strict:
+        strict: if True, also prune any node that remains non-valid after its
+            descendants have been pruned
 
     Returns: List of pruned nodes
 
@@ -63,54 +115,303 @@ def prune(n: Node, strict: bool = False) -> list:
 
     """
     pruned = list()
-    if n.name != "metadata":
-        try:
-            node(n)
-        except UnknownNodeError as ex:
-            logger.debug(f"Pruning: {n.name}")
-            pruned.append((n, str(ex)))
-            if n.parent is not None:
-                n.parent.remove_child(n)
-            Node.delete_node_instance(n.id)
-            return pruned
-        except ChildNotAllowedError as ex:
-            r = rule.get_rule(n.name)
-            children = n.children.copy()
-            for child in children:
-                if not r.is_allowed_child(child.name):
-                    logger.debug(f"Pruning: {child.name}")
-                    pruned.append((child, str(ex)))
-                    n.remove_child(child)
-                    Node.delete_node_instance(child.id)
-        except MetapypeRuleError as ex:
-            logger.debug(ex)
-        children = n.children.copy()
-        for child in children:
-            pruned += prune(child, strict)
-            if strict and child not in pruned:
-                try:
-                    node(child)
-                except MetapypeRuleError as ex:
-                    logger.debug(f"Pruning: {child.name}")
-                    pruned.append((child, str(ex)))
-                    n.remove_child(child)
-                    Node.delete_node_instance(child.id)
+    # Depth-first with an explicit stack; each frame iterates over a copy of the
+    # children, taken after the parent itself has been pruned
+    stack = []
+    if n.name != names.METADATA and not _prune_node(n, pruned):
+        stack.append((n, iter(n.children.copy())))
+    while stack:
+        parent, children = stack[-1]
+        child = next(children, None)
+        if child is None:
+            stack.pop()
+            if strict and stack:
+                _prune_strict(stack[-1][0], parent, pruned)
+        elif child.name == names.METADATA:
+            if strict:
+                _prune_strict(parent, child, pruned)
+        elif not _prune_node(child, pruned):
+            stack.append((child, iter(child.children.copy())))
+    # Pruned subtrees are removed from the node store together
+    Node.delete_node_instances(node for node, _ in pruned)
     return pruned
 
 
-def tree(n: Node, errs: list = None) -> None:
+def tree(n: Node, errs: list = None, max_errors: int = None) -> None:
+    """
+    Walks from the root node and validates each node of the tree for rule
+    compliance; descendants of "metadata" nodes are not validated.
+
+    Args:
+        n: Node instance of root for validates
+        errs: List container for validation errors (fail fast if None)
+        max_errors: if given, stop the walk once this many errors have been added
+            to errs; errors beyond it that were found at the last node are dropped
+
+    Returns:
+        None
+
+    Raises:
+        ValueError: max_errors is less than 1
+    """
+    if max_errors is not None and max_errors < 1:
+        raise ValueError(f"max_errors must be 1 or greater, not {max_errors}")
+    start = len(errs) if errs is not None else 0
+    for descendant in traverse.pre_order(n, _is_validated_parent):
+        _node(descendant, errs)
+        if max_errors is not None and errs is not None and len(errs) - start >= max_errors:
+            del errs[start + max_errors:]
+            break
+    if errs is not None:
+        # The paths of the nodes in error are found when read
+        share_paths(errs[start:])
+
+
+def is_valid(n: Node) -> bool:
     """
-    Recursively walks from the root node and validates
-    each child node for rule compliance.
+    Returns True if the tree rooted at the node complies with the rules; the walk
+    stops at the first error, without raising it
 
     Args:
         n: Node instance of root for validates
+
+    Returns:
+        bool
+    """
+    errs = list()
+    tree(n, errs, max_errors=1)
+    return len(errs) == 0
+
+
+def xml(
+    source, errs: list = None, max_errors: int = None, clean: bool = True, collapse: bool = False, literals: tuple = ()
+) -> None:
+    """
+    Validates an XML document, or an lxml etree element, without building its
+    Metapype model: the rules are applied to read-only views of the lxml elements
+    (see metapype_io.view()). The errors are those that tree() finds in the model
+    built by metapype_io.from_xml() with the same arguments, except that their
+    node is an ElementView and their node_id is None.
+
+    Args:
+        source: XML string, bytes, memoryview, file object, or os.PathLike, or an
+            lxml etree element
         errs: List container for validation errors (fail fast if None)
+        max_errors: if given, the most errors to find (see tree())
+        clean: boolean to clean leading and trailing whitespace from node content
+        collapse: boolean to collapse inner content whitespace to a single space character
+        literals: tuple of XML elements whose content should not be altered
 
     Returns:
         None
+
+    Raises:
+        ValueError: max_errors is less than 1
+    """
+    # Imported here, as for batch(), to keep the XML parser out of the import of this module
+    from metapype.model import metapype_io
+
+    start = len(errs) if errs is not None else 0
+    tree(metapype_io.view(source, clean, collapse, literals), errs, max_errors)
+    if errs is not None:
+        # The views are dropped on return, so the paths of their errors are found now
+        resolve_paths(errs[start:])
+
+
+def _is_validated_parent(n: Node) -> bool:
+    return n.name != names.METADATA
+
+
+class IncrementalValidator(object):
+    """
+    Validator of a tree that is being edited. The tree is validated in full once; its
+    errors are then kept per node and, as the tree is changed through the Node methods
+    (see metapype.model.changes), only the nodes whose name, content, attributes, or
+    children have changed, and the subtrees that have been added, are revalidated when
+    the errors are next asked for. For example:
+
+        validator = IncrementalValidator(eml)
+        dataset.add_child(Node(names.TITLE))
+        errs = validator.errors()
+
+    The errors are those that tree() would find, in the same order. The positions and
+    paths of the nodes in error are also kept, and are found again only for the nodes
+    below those whose children have changed. Changes made other than through the Node
+    methods (e.g., to the dict returned by Node.attributes or the list returned by
+    Node.children) are not noticed.
+    """
+
+    __slots__ = ("_root", "_errors", "_dirty", "_added", "_moved", "_fresh", "_keys", "_order", "__weakref__")
+
+    def __init__(self, root: Node):
+        """
+        Args:
+            root: Node instance of root of the tree to be validated
+        """
+        self._root = root
+        self._errors = {}  # id(node): (node, errors of the node)
+        self._dirty = {}  # id(node): node, for nodes to be revalidated
+        self._added = {}  # id(node): node, for subtrees to be validated
+        self._added[id(root)] = root
+        self._moved = {}  # id(node): node, for nodes whose children have changed
+        self._fresh = set()  # id(node), for nodes whose errors have no paths yet
+        self._keys = {}  # id(node): pre-order sort key, for nodes in error
+        self._order = None  # id(node) of the nodes in error in pre-order, once sorted
+        changes.watch(root, self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self) -> None:
+        """
+        Stops watching the tree for changes
+        """
+        changes.unwatch(self._root, self)
+
+    def changed(self, n: Node, children: bool) -> None:
+        self._dirty[id(n)] = n
+        if children:
+            self._moved[id(n)] = n
+
+    def _forget(self, n: Node) -> None:
+        for descendant in traverse.pre_order(n):
+            key = id(descendant)
+            if self._errors.pop(key, None) is not None:
+                self._keys.pop(key, None)
+                self._order = None
+            self._dirty.pop(key, None)
+            self._added.pop(key, None)
+
+    def added(self, n: Node) -> None:
+        # Errors found before in the subtree, e.g., before it was renamed, are dropped
+        self._forget(n)
+        self._added[id(n)] = n
+
+    def removed(self, n: Node) -> None:
+        # A node that its parent still lists was not removed from the tree
+        if n.parent is not None and any(child is n for child in n.parent.children):
+            return
+        self._forget(n)
+
+    def _is_validated(self, n: Node) -> bool:
+        """
+        Returns True if the node is part of the tree and is not below a "metadata" node
+        """
+        while n.parent is not None:
+            parent = n.parent
+            if not _is_validated_parent(parent) or not any(child is n for child in parent.children):
+                return False
+            n = parent
+        return n is self._root
+
+    def _validate(self, n: Node) -> None:
+        errs = list()
+        _node(n, errs)
+        key = id(n)
+        if len(errs) > 0:
+            if key not in self._errors:
+                self._order = None
+            self._errors[key] = (n, errs)
+            self._fresh.add(key)
+        elif self._errors.pop(key, None) is not None:
+            self._keys.pop(key, None)
+            self._order = None
+
+    def _refresh(self) -> None:
+        validated = set()
+        for n in self._added.values():
+            if self._is_validated(n):
+                for descendant in traverse.pre_order(n, _is_validated_parent):
+                    if id(descendant) not in validated:
+                        validated.add(id(descendant))
+                        self._validate(descendant)
+        for n in self._dirty.values():
+            if id(n) not in validated and self._is_validated(n):
+                self._validate(n)
+        self._added.clear()
+        self._dirty.clear()
+
+    def _position(self, n: Node, positions: dict) -> tuple:
+        """
+        Returns the pre-order sort key of a node: the child indexes along its lineage
+        """
+        lineage = []
+        while n.parent is not None:
+            parent = n.parent
+            if id(parent) not in positions:
+                positions[id(parent)] = {id(child): i for i, child in enumerate(parent.children)}
+            lineage.append(positions[id(parent)][id(n)])
+            n = parent
+        return tuple(reversed(lineage))
+
+    def _is_moved(self, n: Node) -> bool:
+        """
+        Returns True if the children of an ancestor of the node have changed
+        """
+        while n.parent is not None:
+            n = n.parent
+            if id(n) in self._moved:
+                return True
+        return False
+
+    def errors(self) -> list:
+        """
+        Revalidates what has changed since the last call and returns all errors of
+        the tree, as tree() would, with their paths in the tree as it is now
+
+        Returns:
+            List of ValidationErrorRecords
+        """
+        self._refresh()
+        positions = {}
+        unresolved = []
+        for key, (n, records) in self._errors.items():
+            if key not in self._keys or (len(self._moved) > 0 and self._is_moved(n)):
+                self._keys[key] = self._position(n, positions)
+                self._order = None
+                unresolved.extend(records)
+            elif key in self._fresh:
+                unresolved.extend(records)
+        self._moved.clear()
+        self._fresh.clear()
+        if self._order is None:
+            self._order = sorted(self._errors, key=self._keys.__getitem__)
+        share_paths(unresolved)
+        return [record for key in self._order for record in self._errors[key][1]]
+
+    def is_valid(self) -> bool:
+        """
+        Returns True if the tree complies with the rules
+        """
+        self._refresh()
+        return len(self._errors) == 0
+
+
+def batch(
+    documents: Iterable, workers: int = None, ordered: bool = True, chunksize: int = 1, max_errors: int = None
+) -> Iterator:
     """
-    node(n, errs)
-    if n.name != "metadata":
-        for child in n.children:
-            tree(child, errs)
+    Parses and validates EML documents across worker processes (see tree())
+
+    Args:
+        documents: file system paths (str or os.PathLike) and/or XML content (str
+            starting with "<", or bytes)
+        workers: number of worker processes (default os.cpu_count()); 1 validates the
+            documents one after another in the calling process
+        ordered: boolean to yield results in the order of the documents rather than
+            as they are completed
+        chunksize: number of documents sent to a worker at a time when ordered
+        max_errors: if given, the most errors to find in each document (see tree())
+
+    Returns:
+        Iterator of BatchResult, whose records are ValidationErrorRecords
+    """
+    check = tree if max_errors is None else functools.partial(tree, max_errors=max_errors)
+    # Imported here so that importing this module does not load the process pool
+    # and XML parser machinery
+    from metapype.eml import batch as _batch
+
+    return _batch.run(check, documents, workers, ordered, chunksize)
@@ -12,6 +12,9 @@
     6/23/20
 """
 from enum import Enum, auto
+import weakref
+
+from metapype.model import xpath
 
 
 class ValidationError(Enum):
@@ -36,3 +39,181 @@ class ValidationError(Enum):
     UNKNOWN_ATTRIBUTE = auto()
     UNKNOWN_CONTENT_RULE = auto()
     UNKNOWN_NODE = auto()
+    CONTENT_EXPECTED_INT = auto()  # Added last so that the values of the others are kept
+
+
+def _jsonable(value):
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    if isinstance(value, (list, tuple)):
+        return [_jsonable(item) for item in value]
+    return str(value)
+
+
+class LazyMessage(object):
+    """
+    An error message that is formatted from its template and values only when it is
+    first rendered with str()
+    """
+
+    __slots__ = ("_template", "_values", "_text")
+
+    def __init__(self, template: str, *values):
+        self._template = template
+        self._values = values
+        self._text = None
+
+    def __str__(self):
+        if self._text is None:
+            self._text = self._template.format(*self._values)
+            self._values = None
+        return self._text
+
+    def __repr__(self):
+        return repr(str(self))
+
+
+def _restore(code, message: str, path: str, node_id: str, args: tuple) -> "ValidationErrorRecord":
+    record = ValidationErrorRecord.__new__(ValidationErrorRecord)
+    record.code = code
+    record._message = message
+    record._path = path
+    record._paths = None
+    record.node_id = node_id
+    record.args = args
+    record._node = None
+    return record
+
+
+def resolve_paths(records: list, cache: dict = None, refresh: bool = False) -> None:
+    """
+    Fixes the location path of each record whose node is still alive, sharing the
+    work of finding the paths of nodes of the same tree
+
+    Args:
+        records: list of errors; entries other than ValidationErrorRecords are skipped
+        cache: optional dict of node paths (see metapype.model.xpath.path())
+        refresh: boolean to find the path of records that already have one, e.g.,
+            after the tree has been changed
+    """
+    if cache is None:
+        cache = {}
+    for record in records:
+        if isinstance(record, ValidationErrorRecord) and (refresh or record._path is None):
+            node = record.node
+            if node is not None:
+                record._path = xpath.path(node, cache)
+
+
+def share_paths(records: list, cache: dict = None) -> None:
+    """
+    Has each record find the location path of its node again, lazily, when the path
+    is first read, sharing the work of finding the paths of nodes of the same tree;
+    the paths are those of the nodes in the tree as it is when they are read
+
+    Args:
+        records: list of errors; entries other than ValidationErrorRecords are skipped
+        cache: optional dict of node paths (see metapype.model.xpath.path()), which
+            must not be shared across changes of the tree
+    """
+    if cache is None:
+        cache = {}
+    for record in records:
+        if isinstance(record, ValidationErrorRecord):
+            record._path = None
+            record._paths = cache
+
+
+class ValidationErrorRecord(object):
+    """
+    A validation error: its code, message, the location path (e.g.,
+    "/eml/dataset/dataTable[2]/physical") and identifier of the node in error, any
+    further arguments, and a weak reference to the node. A record unpacks and indexes
+    like the (code, msg, node, *args) tuple that it replaces (use tuple(record) to
+    compare it with such a tuple); the node is None once it has been garbage collected
+    or the record has been pickled. Records are equal if their code, message, path,
+    node identifier, and arguments are; they hash by code and node identifier only,
+    as the path of a record is found again when its tree changes.
+
+    The path is found on first access, from the tree as it is then; the records of
+    one call of validate.node() or validate.tree() share the work of finding their
+    paths (see share_paths()), and resolve_paths() finds them all at once, e.g.,
+    before the tree is changed or dropped. The path is None if the node was collected
+    before then. The message may be given as a LazyMessage, which is rendered only if
+    the message is read.
+    """
+
+    __slots__ = ("code", "_message", "_path", "_paths", "node_id", "args", "_node")
+
+    def __init__(self, code, message, node, *args):
+        self.code = code
+        self._message = message
+        self._path = None
+        self._paths = None
+        self.node_id = node.id
+        self.args = args
+        self._node = weakref.ref(node)
+
+    @property
+    def node(self):
+        return self._node() if self._node is not None else None
+
+    @property
+    def message(self) -> str:
+        if self._message.__class__ is LazyMessage:
+            self._message = str(self._message)
+        return self._message
+
+    @property
+    def path(self) -> str:
+        if self._path is None:
+            node = self.node
+            if node is not None:
+                self._path = xpath.path(node, self._paths)
+                self._paths = None
+        return self._path
+
+    def _fields(self) -> tuple:
+        return (self.code, self.message, self.node, *self.args)
+
+    def __iter__(self):
+        return iter(self._fields())
+
+    def __len__(self):
+        return 3 + len(self.args)
+
+    def __getitem__(self, item):
+        return self._fields()[item]
+
+    def __eq__(self, other):
+        if isinstance(other, ValidationErrorRecord):
+            return (self.code, self.message, self.path, self.node_id, self.args) == (
+                other.code,
+                other.message,
+                other.path,
+                other.node_id,
+                other.args,
+            )
+        return NotImplemented
+
+    def __hash__(self):
+        return hash((self.code, self.node_id))
+
+    def __repr__(self):
+        return f"ValidationErrorRecord({self.code}, {self.message!r}, {self.path!r})"
+
+    def __reduce__(self):
+        return _restore, (self.code, self.message, self.path, self.node_id, self.args)
+
+    def to_dict(self) -> dict:
+        """
+        Returns the record as a JSON-serializable dict; arguments that are not JSON
+        values (e.g., types) are given as strings
+        """
+        return {
+            "code": self.code.name,
+            "message": self.message,
+            "path": self.path,
+            "node_id": self.node_id,
+            "args": _jsonable(self.args),
+        }
@@ -0,0 +1,106 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+:Mod: changes
+
+:Synopsis:
+    Opt-in notification of changes to Metapype model trees. A watcher is any object
+    with the methods changed(node, children), added(node), and removed(node); once
+    registered with watch() for the root of a tree, it is told of every change made to
+    that tree through the Node methods:
+
+        changed(node, children)   the name, content, attributes, or children of node
+                                  changed; children is True if node's children were
+                                  added, removed, or reordered (or one was renamed)
+        added(node)               node, with its subtree, was added as a child
+        removed(node)             node, with its subtree, was removed as a child
+
+    A change is reported to the watchers of the root reached by following the parent
+    links of the changed node, so watchers of other trees are never told of it. A
+    watched root that is itself added to another tree is no longer watched. Watchers
+    are held by weak reference, and changes are only looked for while at least one
+    watcher is registered. Used by validate.IncrementalValidator.
+
+:Author:
+    agent
+
+:Created:
+    10/17/26
+"""
+import weakref
+
+import daiquiri
+
+
+logger = daiquiri.getLogger(__name__)
+
+# The watched roots by id(): (root, {id(watcher): weak reference to watcher}). Roots
+# are held, so their ids are not reused while watched; a watcher is dropped once it
+# has been garbage collected
+_watched = {}
+
+
+def watching() -> bool:
+    """
+    Returns True if any watcher is registered
+    """
+    return len(_watched) > 0
+
+
+def _forget(root_key: int, key: int, ref: weakref.ref) -> None:
+    watchers = _watched.get(root_key, (None, {}))[1]
+    # The id of a collected watcher may have been taken by a newer one
+    if watchers.get(key) is ref:
+        del watchers[key]
+        if len(watchers) == 0:
+            del _watched[root_key]
+
+
+def watch(root, watcher) -> None:
+    """
+    Registers a watcher of the changes to the tree rooted at root
+
+    Args:
+        root: Node instance of the root of the tree
+        watcher: object with the methods changed(), added(), and removed()
+    """
+    root_key, key = id(root), id(watcher)
+    if root_key not in _watched:
+        _watched[root_key] = (root, {})
+    _watched[root_key][1][key] = weakref.ref(watcher, lambda ref: _forget(root_key, key, ref))
+
+
+def unwatch(root, watcher) -> None:
+    watchers = _watched.get(id(root), (None, {}))[1]
+    watchers.pop(id(watcher), None)
+    if len(watchers) == 0:
+        _watched.pop(id(root), None)
+
+
+def notify(node, added=(), removed=(), reordered: bool = False) -> None:
+    """
+    Reports a change of node to the watchers of its tree
+
+    Args:
+        node: Node instance whose name, content, attributes, or children changed
+        added: the children added to node
+        removed: the children removed from node
+        reordered: boolean, True if the children of node were reordered
+    """
+    root = node
+    while root.parent is not None:
+        root = root.parent
+    watchers = _watched.get(id(root), (None, {}))[1]
+    if len(watchers) == 0:
+        return
+    children = reordered or len(added) > 0 or len(removed) > 0
+    for ref in list(watchers.values()):
+        watcher = ref()
+        if watcher is None:
+            continue
+        for child in removed:
+            watcher.removed(child)
+        for child in added:
+            watcher.added(child)
+        watcher.changed(node, children)
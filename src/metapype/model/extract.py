@@ -0,0 +1,303 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+:Mod: extract
+
+:Synopsis:
+    Extraction of many named XPath subset queries (see metapype.model.xpath) in a
+    single pass. The queries are compiled into one combined matcher whose states
+    are (query, step) pairs; every node is visited at most once and only subtrees
+    in which some query may still match are entered. For example:
+
+        extractor = Extractor({
+            "title": "/eml/dataset/title",
+            "surnames": "//creator/individualName/surName",
+            "entities": "//dataTable/entityName",
+        })
+        results = extractor.extract(eml)
+        results = extractor.extract_stream("eml.xml")
+
+    extract() returns the nodes of a Metapype model; extract_stream() matches the
+    elements of an XML document while it is being parsed and builds Metapype nodes
+    only for the matched elements and their descendants.
+
+:Author:
+    agent
+
+:Created:
+    10/17/26
+"""
+import itertools
+import os
+
+import daiquiri
+from lxml import etree
+
+from metapype.model import metapype_io
+from metapype.model import xpath
+from metapype.model.xpath import CHILD
+
+
+logger = daiquiri.getLogger(__name__)
+
+
+def _stream_plan(predicates: tuple):
+    """
+    Splits the predicates of a step into those preceding a position, the position, and
+    those following it, which is how they are applied to elements as they are parsed.
+    Returns None if the predicates cannot be applied before the following siblings of an
+    element are known.
+    """
+    before = []
+    after = []
+    position = None
+    for kind, argument in predicates:
+        if kind == "last" or (kind == "position" and position is not None):
+            return None
+        if kind == "position":
+            position = argument
+        elif position is None:
+            before.append((kind, argument))
+        else:
+            after.append((kind, argument))
+    return tuple(before), position, tuple(after)
+
+
+def _element_test(e, predicates: tuple) -> bool:
+    for kind, (name, value) in predicates:
+        attribute = e.get(name)
+        if attribute is None:
+            return False
+        if kind == "=" and attribute != value:
+            return False
+        if kind == "!=" and attribute == value:
+            return False
+    return True
+
+
+class Extractor(object):
+    """
+    Combined matcher of named XPath subset queries
+    """
+
+    __slots__ = ("_keys", "_steps", "_lasts", "_plans", "_document", "_context", "_self_keys")
+
+    def __init__(self, queries: dict):
+        """
+        Args:
+            queries: dict of result key to XPath subset expression (or compiled XPath)
+
+        Raises:
+            ValueError: an expression is not supported
+        """
+        self._keys = tuple(queries.keys())
+        compiled = [
+            xpath.compile(expression) if isinstance(expression, str) else expression
+            for expression in queries.values()
+        ]
+        self._steps = tuple(expression.steps for expression in compiled)
+        self._lasts = tuple(len(steps) - 1 for steps in self._steps)
+        self._plans = {
+            (q, i): _stream_plan(predicates)
+            for q, steps in enumerate(self._steps)
+            for i, (_, _, predicates) in enumerate(steps)
+            if predicates
+        }
+        # Initial states of the document (for absolute queries) and of the context
+        # node (for relative ones), each split into child and descendant states
+        document = (set(), set())
+        context = (set(), set())
+        self._self_keys = []
+        for q, expression in enumerate(compiled):
+            if len(self._steps[q]) == 0:
+                self._self_keys.append(self._keys[q])
+                continue
+            states = document if expression.absolute else context
+            states[0 if self._steps[q][0][0] == CHILD else 1].add((q, 0))
+        self._document = (frozenset(document[0]), frozenset(document[1]))
+        self._context = (frozenset(context[0]), frozenset(context[1]))
+
+    def __repr__(self):
+        return f"Extractor({list(self._keys)!r})"
+
+    @property
+    def keys(self) -> tuple:
+        return self._keys
+
+    def _advance(self, children: list, child_states, desc_states) -> list:
+        """
+        Matches the states of a parent against its children, returning for each child
+        a tuple of (child, child states, descendant states, matched query indexes)
+        """
+        selected_by_state = []
+        by_name = None
+        for state in itertools.chain(child_states, desc_states):
+            q, i = state
+            _, name, predicates = self._steps[q][i]
+            if name is None:
+                selected = range(len(children))
+            else:
+                if by_name is None:
+                    by_name = {}
+                    for k, child in enumerate(children):
+                        by_name.setdefault(child.name, []).append(k)
+                selected = by_name.get(name)
+                if selected is None:
+                    continue
+            if predicates:
+                kept = {id(child) for child in xpath.apply_predicates([children[k] for k in selected], predicates)}
+                selected = [k for k in selected if id(children[k]) in kept]
+            if len(selected) > 0:
+                selected_by_state.append((q, i, selected))
+
+        matched = [()] * len(children)
+        advanced = [None] * len(children)
+        for q, i, selected in selected_by_state:
+            if i == self._lasts[q]:
+                for k in selected:
+                    matched[k] += (q,)
+            else:
+                for k in selected:
+                    if advanced[k] is None:
+                        advanced[k] = []
+                    advanced[k].append((q, i + 1))
+
+        frames = []
+        for k, child in enumerate(children):
+            child_next = ()
+            desc_next = desc_states
+            if advanced[k] is not None:
+                child_next = frozenset(state for state in advanced[k] if self._steps[state[0]][state[1]][0] == CHILD)
+                descendant = [state for state in advanced[k] if self._steps[state[0]][state[1]][0] != CHILD]
+                if descendant:
+                    desc_next = desc_states.union(descendant)
+            frames.append((child, child_next, desc_next, matched[k]))
+        return frames
+
+    def extract(self, node) -> dict:
+        """
+        Returns the nodes selected by each query in a single traversal of the tree,
+        evaluating relative queries from node and absolute ones from the root of its tree
+
+        Args:
+            node: context Node
+
+        Returns:
+            Dict of result key to list of Nodes in document order
+        """
+        results = {key: [] for key in self._keys}
+        context = node
+        if len(self._document[0]) > 0 or len(self._document[1]) > 0:
+            while node.parent is not None:
+                node = node.parent
+            frames = self._advance([node], *self._document)
+        else:
+            frames = [(node, (), frozenset(), ())]
+        while frames:
+            node, child_states, desc_states, matched = frames.pop()
+            for q in matched:
+                results[self._keys[q]].append(node)
+            if node is context:
+                for key in self._self_keys:
+                    results[key].append(node)
+                child_states = self._context[0].union(child_states)
+                desc_states = self._context[1].union(desc_states)
+            if len(node.children) > 0 and (len(child_states) > 0 or len(desc_states) > 0):
+                frames.extend(reversed(self._advance(node.children, child_states, desc_states)))
+        return results
+
+    def extract_stream(
+        self,
+        source,
+        clean: bool = True,
+        collapse: bool = False,
+        literals: tuple = (),
+        huge_tree: bool = False,
+        register: bool = True,
+    ) -> dict:
+        """
+        Returns the nodes selected by each query while parsing an XML document
+        incrementally; relative queries are evaluated from the root element. Metapype
+        nodes are built only for the matched elements (and their descendants), and the
+        lxml elements are released as soon as they are no longer needed. A node that is
+        a descendant of another matched node is built separately from it.
+
+        Args:
+            source: file system path or binary file object of the XML document
+            clean: boolean to clean leading and trailing whitespace from node content
+            collapse: boolean to collapse inner content whitespace to a single space character
+            literals: tuple of XML elements whose content should not be altered
+            huge_tree: boolean to disable the libxml2 security restrictions on very deep
+                trees and very long text content
+            register: boolean to register the nodes in the active node store
+
+        Returns:
+            Dict of result key to list of Nodes in document order
+
+        Raises:
+            ValueError: a query has a predicate that depends on following siblings
+                ("last()", or a second position)
+        """
+        for (q, _), plan in self._plans.items():
+            if plan is None:
+                msg = f'Query "{self._keys[q]}" cannot be evaluated while parsing'
+                raise ValueError(msg)
+        if isinstance(source, os.PathLike):
+            source = os.fspath(source)
+        results = {key: [] for key in self._keys}
+        # For each open element: child states, descendant states, positional counters
+        # of its children, and the result slots of the element itself
+        frames = [(self._document[0], self._document[1], {}, None)]
+        building = 0  # Number of open elements whose subtrees are to be built
+        for event, e in etree.iterparse(source, events=("start", "end"), huge_tree=huge_tree):
+            if event == "end":
+                slots = frames.pop()[3]
+                if slots is not None:
+                    node = metapype_io.from_element(e, clean, collapse, literals, register)
+                    node.tail = None  # Not yet parsed and not part of the match
+                    for key, position in slots:
+                        results[key][position] = node
+                    building -= 1
+                if building == 0:
+                    e.clear(keep_tail=True)
+                continue
+            child_states, desc_states, counters, _ = frames[-1]
+            name = e.tag[e.tag.find("}") + 1:]
+            matched = []
+            child_next = set()
+            desc_next = desc_states
+            for state in itertools.chain(child_states, desc_states):
+                q, i = state
+                _, step_name, predicates = self._steps[q][i]
+                if step_name is not None and step_name != name:
+                    continue
+                if predicates:
+                    before, position, after = self._plans[state]
+                    if not _element_test(e, before):
+                        continue
+                    if position is not None:
+                        counters[state] = counters.get(state, 0) + 1
+                        if counters[state] != position:
+                            continue
+                    if not _element_test(e, after):
+                        continue
+                if i == self._lasts[q]:
+                    matched.append(self._keys[q])
+                elif self._steps[q][i + 1][0] == CHILD:
+                    child_next.add((q, i + 1))
+                else:
+                    desc_next = desc_next.union(((q, i + 1),))
+            if len(frames) == 1:
+                matched.extend(self._self_keys)
+                child_next.update(self._context[0])
+                desc_next = desc_next.union(self._context[1])
+            slots = None
+            if matched:
+                slots = []
+                for key in matched:
+                    slots.append((key, len(results[key])))
+                    results[key].append(None)
+                building += 1
+            frames.append((child_next, desc_next, {}, slots))
+        return results
@@ -0,0 +1,166 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+:Mod: index
+
+:Synopsis:
+    Opt-in lookup index of a Metapype model subtree. An index is attached to a
+    node with Node.build_index() and is built in a single traversal. Mutating
+    the subtree through the Node methods (add_child, remove_child, replace_child,
+    etc.) marks the index stale; it is rebuilt on the next lookup.
+
+    Besides name-paths, the index maps each element name to its nodes in
+    document order, together with the pre-order position of every node and the
+    end of its subtree, so that the descendants of any indexed node with a given
+    name are found by bisection.
+
+:Author:
+    agent
+
+:Created:
+    10/17/26
+"""
+from bisect import bisect_left, bisect_right
+import weakref
+
+import daiquiri
+
+
+logger = daiquiri.getLogger(__name__)
+
+# Indexes that are attached to a node; mutations only look for indexes to
+# invalidate while this set is non-empty
+_live = weakref.WeakSet()
+
+
+def indexes_active() -> bool:
+    """
+    Returns True if an index is attached to any node
+    """
+    return len(_live) > 0
+
+
+class TreeIndex(object):
+    """
+    Index of the subtree rooted at a node, keyed by name-path relative to that node.
+    For each path, the index holds the matching nodes in document order and the node
+    found by following the first child of each name along the path (the result of
+    Node.find_single_node_by_path()). For each name, it holds the nodes of that name
+    in document order and their pre-order positions.
+    """
+
+    __slots__ = ("_root", "_paths", "_firsts", "_names", "_starts", "_spans", "__weakref__")
+
+    def __init__(self, root):
+        self._root = root
+        self._paths = None
+        self._firsts = None
+        self._names = None
+        self._starts = None
+        self._spans = None
+        _live.add(self)
+
+    def _build(self):
+        paths = {}
+        firsts = {}
+        names = {}
+        starts = {}
+        spans = {}
+        position = 0
+        stack = [(self._root, (), True)]
+        while stack:
+            item = stack.pop()
+            if item.__class__ is not tuple:
+                # End of the subtree of node item
+                spans[item] = (spans[item], position)
+                continue
+            node, path, first = item
+            if len(path) > 0:
+                paths.setdefault(path, []).append(node)
+                if first:
+                    firsts[path] = node
+            names.setdefault(node.name, []).append(node)
+            starts.setdefault(node.name, []).append(position)
+            spans[node] = position
+            position += 1
+            stack.append(node)
+            children = []
+            seen = set()
+            for child in node.children:
+                name = child.name
+                children.append((child, path + (name,), first and name not in seen))
+                seen.add(name)
+            stack.extend(reversed(children))
+        self._paths = paths
+        self._firsts = firsts
+        self._names = names
+        self._starts = starts
+        self._spans = spans
+
+    def invalidate(self):
+        """
+        Marks the index stale so that it is rebuilt on the next lookup
+        """
+        self._paths = None
+        self._firsts = None
+        self._names = None
+        self._starts = None
+        self._spans = None
+
+    def detach(self):
+        self.invalidate()
+        _live.discard(self)
+
+    def find_all(self, path: tuple) -> list:
+        """
+        Returns the nodes at the name-path below the indexed node, in document order
+
+        Args:
+            path: tuple of node names
+
+        Returns:
+            List of Nodes, which may be empty
+        """
+        if self._paths is None:
+            self._build()
+        return list(self._paths.get(path, ()))
+
+    def find_first(self, path: tuple):
+        """
+        Returns the node found by following the first child of each name along the path
+
+        Args:
+            path: tuple of node names
+
+        Returns:
+            Node or None
+        """
+        if self._firsts is None:
+            self._build()
+        return self._firsts.get(path)
+
+    def find_descendants(self, node, name: str) -> list:
+        """
+        Returns the descendants of node (excluding node itself) with the name, in
+        document order
+
+        Args:
+            node: Node of the indexed subtree
+            name: node name to be matched
+
+        Returns:
+            List of Nodes, which may be empty, or None if node is not part of the
+            indexed subtree (e.g., its parent link was set but its parent does not
+            list it as a child)
+        """
+        if self._spans is None:
+            self._build()
+        span = self._spans.get(node)
+        if span is None:
+            return None
+        start, end = span
+        starts = self._starts.get(name)
+        if starts is None:
+            return []
+        return self._names[name][bisect_right(starts, start):bisect_left(starts, end)]
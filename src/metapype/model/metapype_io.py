@@ -13,29 +13,37 @@
 :Created:
     12/30/20
 """
+import codecs
+import contextlib
+import io
 import json
+import os
 import re
+from typing import Iterable, Iterator
 
 import daiquiri
 from lxml import etree
 from xml.sax.saxutils import escape
 
+from metapype.model import traverse
 from metapype.model.node import Node
 
 
 logger = daiquiri.getLogger(__name__)
 
+WRITE_BUFFER_SIZE = 65536
 
-def _from_dict(node: dict, parent: Node = None) -> Node:
+
+def _dict_node(node: dict, parent: Node = None) -> tuple:
     """
-    Build a Metapype model from a dict.
+    Build a Metapype node, without its children, from a dict.
 
     Args:
         node: dict representation of a Metapype model
         parent: parent node of current node (root node will be None)
 
     Returns:
-        Node: current node of Metapype model
+        tuple of the Node and the list of dict representations of its children
 
     """
     name, body = node.popitem()
@@ -71,12 +79,36 @@ def _from_dict(node: dict, parent: Node = None) -> Node:
     if tail is not None:
         node.tail = tail
 
-    children = body[7]["children"]
-    for child in children:
-        child_node = _from_dict(child, node)
-        node.add_child(child_node)
+    return node, body[7]["children"]
 
-    return node
+
+def _from_dict(node: dict, parent: Node = None) -> Node:
+    """
+    Build a Metapype model from a dict.
+
+    Args:
+        node: dict representation of a Metapype model
+        parent: parent node of current node (root node will be None)
+
+    Returns:
+        Node: current node of Metapype model
+
+    """
+    root, children = _dict_node(node, parent)
+    # Depth-first with an explicit stack; a node is added to its parent once all
+    # of its own children have been added
+    stack = [(root, iter(children))]
+    while stack:
+        node, children = stack[-1]
+        child = next(children, None)
+        if child is not None:
+            child_node, grandchildren = _dict_node(child, node)
+            stack.append((child_node, iter(grandchildren)))
+        else:
+            stack.pop()
+            if stack:
+                stack[-1][0].add_child(node)
+    return root
 
 
 def _format_extras(name: str, nsmap: dict) -> str:
@@ -102,16 +134,46 @@ def _nsp_unique(child_nsmap: dict, parent_nsmap: dict) -> dict:
     return nsmap
 
 
-def _process_element(e, clean, collapse, literals) -> Node:
+def _clean_text(text: str, clean: bool, collapse: bool, literal: bool = False) -> str:
     """
-    Process an lxml etree element into a Metapype node. If the clean attribute is true, then
-    remove leading and trailing whitespace from the element content.
+    Clean element text or tail content: if clean is true, remove leading and trailing
+    whitespace, unless the text consists entirely of one or more spaces, non-breaking
+    spaces, and/or tabs, or is literal content.
+
+    Args:
+        text: element text or tail
+        clean: boolean to clean leading and trailing whitespace from content
+        collapse: collapse inner content whitespace to a single space character
+        literal: boolean indicating that the content should not be altered
+
+    Returns: cleaned text or None if nothing remains
+
+    """
+    if not clean or text is None or literal:
+        return text
+    # if text consists entirely of one or more spaces and/or non-breaking spaces, keep it
+    if re.search("^[ \xA0\x09]+$", text):
+        return text
+    cleaned = text.strip()
+    if cleaned == '':
+        return None
+    elif collapse:
+        return " ".join(text.split())
+    return cleaned
+
+
+def _element_node(e, clean, collapse, literals, tail: bool = True) -> Node:
+    """
+    Process a single lxml etree element, without its children, into a Metapype node. If
+    the clean attribute is true, then remove leading and trailing whitespace from the
+    element content.
 
     Args:
         e: lxml etree element
         clean: boolean to clean leading and trailing whitespace from node content
         collapse: collapse inner content whitespace to a single space character
         literals: tuple of XML elements whose content should not be altered
+        tail: boolean to process the element tail
 
     Returns: Node
 
@@ -121,34 +183,9 @@ def _process_element(e, clean, collapse, literals) -> Node:
     node = Node(tag)
     node.nsmap = e.nsmap
     node.prefix = e.prefix
-
-    if clean:
-        if e.text is not None:
-            if tag in literals:
-                node.content = e.text
-            else:
-                # if text consists entirely of one or more spaces and/or non-breaking spaces, keep it
-                if re.search("^[ \xA0\x09]+$", e.text):
-                    node.content = e.text
-                else:
-                    node.content = e.text.strip()
-                    if node.content == '':
-                        node.content = None
-                    elif collapse:
-                        node.content = " ".join(e.text.split())
-        if e.tail is not None:
-            # if tail consists entirely of one or more spaces and/or non-breaking spaces, keep it
-            if re.search("^[ \xA0\x09]+$", e.tail):
-                node.tail = e.tail
-            else:
-                node.tail = e.tail.strip()
-                if node.tail == '':
-                    node.tail = None
-                elif collapse:
-                    node.tail = " ".join(e.tail.split())
-    else:
-        node.content = e.text
-        node.tail = e.tail
+    node.content = _clean_text(e.text, clean, collapse, tag in literals)
+    if tail:
+        node.tail = _clean_text(e.tail, clean, collapse)
 
     for name, value in e.attrib.items():
         if "{" not in name:
@@ -156,40 +193,129 @@ def _process_element(e, clean, collapse, literals) -> Node:
         else:
             nsname = _format_extras(name, node.nsmap)
             node.add_extras(nsname, value)
+    return node
+
 
-    for _ in e:
-        if _.tag is not etree.Comment:
-            node.add_child(_process_element(_, clean, collapse, literals))
+def _add_children(node: Node, children) -> None:
+    for child in children:
+        node.add_child(child)
     for child in node.children:
         child.parent = node
         if child.nsmap == node.nsmap:
             child.nsmap = node.nsmap  # Map to single instance of nsmap
-    return node
 
 
-def _serialize(node: Node) -> dict:
+def _process_element(e, clean, collapse, literals) -> Node:
     """
-    Serializes a Metapype model instance into a Python dict
+    Process an lxml etree element into a Metapype node. If the clean attribute is true, then
+    remove leading and trailing whitespace from the element content.
 
     Args:
-        node: Metapype node to serialize
+        e: lxml etree element
+        clean: boolean to clean leading and trailing whitespace from node content
+        collapse: collapse inner content whitespace to a single space character
+        literals: tuple of XML elements whose content should not be altered
 
-    Returns:
-        dict: Metapype model instance dictionary
+    Returns: Node
 
     """
+    root = _element_node(e, clean, collapse, literals)
+    # Depth-first with an explicit stack; a node is added to its parent once all
+    # of its own children have been added
+    stack = [(root, iter(e))]
+    while stack:
+        node, elements = stack[-1]
+        for _ in elements:
+            if _.tag is not etree.Comment:
+                stack.append((_element_node(_, clean, collapse, literals), iter(_)))
+                break
+        else:
+            stack.pop()
+            _add_children(node, ())
+            if stack:
+                stack[-1][0].add_child(node)
+    return root
+
+
+class ElementView(object):
+    """
+    Read-only view of an lxml etree element through the parts of the Node interface
+    that validation uses: name, content, attributes, parent, and children. The
+    content and attributes are those that from_xml() would give the Node of the
+    element. Children views are made when they are first accessed; views have no
+    identifier and are not registered in a node store.
+    """
+
+    __slots__ = ("_e", "_options", "name", "content", "parent", "_children", "__weakref__")
+
+    id = None
+
+    def __init__(self, e, options: tuple, parent=None):
+        clean, collapse, literals = options
+        self._e = e
+        self._options = options
+        self.name = e.tag[e.tag.find("}") + 1:]  # Remove any prepended namespace
+        self.content = _clean_text(e.text, clean, collapse, self.name in literals)
+        self.parent = parent
+        self._children = None
+
+    def __repr__(self):
+        return f"ElementView({self.name!r})"
+
+    @property
+    def element(self):
+        return self._e
+
+    @property
+    def children(self) -> list:
+        if self._children is None:
+            self._children = [ElementView(e, self._options, self) for e in self._e if isinstance(e.tag, str)]
+        return self._children
+
+    @property
+    def attributes(self) -> dict:
+        return {name: value for name, value in self._e.attrib.items() if "{" not in name}
+
+    def list_attributes(self) -> list:
+        return [name for name in self._e.attrib.keys() if "{" not in name]
+
+    def attribute_value(self, name):
+        return None if "{" in name else self._e.get(name)
+
+
+def _serialize_node(node: Node) -> tuple:
     j = {node.name: []}
     j[node.name].append({"id": node.id})
     j[node.name].append({"nsmap": node.nsmap})
     j[node.name].append({"prefix": node.prefix})
-    j[node.name].append({"attributes": node.attributes})
-    j[node.name].append({"extras": node.extras})
+    j[node.name].append({"attributes": node.attributes if len(node.list_attributes()) > 0 else {}})
+    j[node.name].append({"extras": node.extras if len(node.list_extras()) > 0 else {}})
     j[node.name].append({"content": node.content})
     j[node.name].append({"tail": node.tail})
     children = []
-    for child in node.children:
-        children.append(_serialize(child))
     j[node.name].append({"children": children})
+    return j, children
+
+
+def _serialize(node: Node) -> dict:
+    """
+    Serializes a Metapype model instance into a Python dict
+
+    Args:
+        node: Metapype node to serialize
+
+    Returns:
+        dict: Metapype model instance dictionary
+
+    """
+    j, children = _serialize_node(node)
+    stack = [(node, children)]
+    while stack:
+        node, children = stack.pop()
+        for child in node.children:
+            child_j, child_children = _serialize_node(child)
+            children.append(child_j)
+            stack.append((child, child_children))
     return j
 
 
@@ -235,48 +361,193 @@ def graph(node: Node, level: int = 0) -> str:
     Returns:
         str: String representation of the model instance.
     """
-    indent = "  " * level
-    g = f"{node.name}[{node.id}]" if node.prefix is None else f"{node.prefix}:{node.name}[{node.id}]"
-    if node.content is not None:
-        g += f": {node.content}"
-    if len(node.attributes) > 0:
-        g += f" {str(node.attributes)}"
-    if level == 0:
-        g += "\n"
+    g = []
+    for event, n, depth in traverse.walk(node):
+        if event == traverse.END:
+            continue
+        depth += level
+        line = f"{n.name}[{n.id}]" if n.prefix is None else f"{n.prefix}:{n.name}[{n.id}]"
+        if n.content is not None:
+            line += f": {n.content}"
+        if len(n.list_attributes()) > 0:
+            line += f" {str(n.attributes)}"
+        if depth == 0:
+            g.append(line + "\n")
+        else:
+            g.append("  " * depth + "\u2570\u2500 " + line + "\n")
+    return "".join(g)
+
+
+def _parse_xml(xml):
+    """
+    Parse XML from a string, a bytes-like object, a file object, or a file system path
+    into an lxml etree element. Anything other than a str is handed directly to lxml.
+    """
+    if isinstance(xml, str):
+        return etree.fromstring(xml.encode("utf-8"))
+    elif isinstance(xml, (bytes, bytearray, memoryview)):
+        return etree.fromstring(xml)
+    elif isinstance(xml, os.PathLike) or hasattr(xml, "read"):
+        return etree.parse(xml).getroot()
     else:
-        g = indent + "\u2570\u2500 " + g + "\n"
-    for child in node.children:
-        g += graph(child, level + 1)
-    return g
+        raise TypeError(f"Cannot parse XML from type {type(xml).__name__}")
+
+
+def _registration(register: bool):
+    """
+    Returns a context in which new nodes are registered in the active node store or, if
+    register is false, in no store at all.
+    """
+    return contextlib.nullcontext() if register else Node.store_scope(register=False)
 
 
-def from_xml(xml: str, clean: bool = True, collapse: bool = False, literals: tuple = ()) -> Node:
+def from_xml(xml, clean: bool = True, collapse: bool = False, literals: tuple = (), register: bool = True) -> Node:
     """
     Convert an XML model into a Metapype model. If clean is true, remove leading and trailing whitespace
     from the element content.
 
     Args:
-        xml: XML string to be converted
+        xml: XML string, bytes, memoryview, file object, or os.PathLike to be converted
+        clean: boolean to clean leading and trailing whitespace from node content
+        collapse: boolean to collapse inner content whitespace to a single space character
+        literals: tuple of XML elements whose content should not be altered
+        register: boolean to register the nodes in the active node store
+
+    Returns: the root Node of the Metapype model
+
+    """
+    e = _parse_xml(xml)
+    with _registration(register):
+        root = _process_element(e, clean, collapse, literals)
+    return root
+
+
+def from_element(e, clean: bool = True, collapse: bool = False, literals: tuple = (), register: bool = True) -> Node:
+    """
+    Convert an lxml etree element and its descendants into a Metapype model. If clean is
+    true, remove leading and trailing whitespace from the element content.
+
+    Args:
+        e: lxml etree element
+        clean: boolean to clean leading and trailing whitespace from node content
+        collapse: boolean to collapse inner content whitespace to a single space character
+        literals: tuple of XML elements whose content should not be altered
+        register: boolean to register the nodes in the active node store
+
+    Returns: the root Node of the Metapype model
+
+    """
+    with _registration(register):
+        root = _process_element(e, clean, collapse, literals)
+    return root
+
+
+def from_xml_file(
+    source, clean: bool = True, collapse: bool = False, literals: tuple = (), register: bool = True
+) -> Node:
+    """
+    Convert an XML file into a Metapype model. If clean is true, remove leading and trailing
+    whitespace from the element content.
+
+    Args:
+        source: file system path (str or os.PathLike) or file object of the XML document
         clean: boolean to clean leading and trailing whitespace from node content
         collapse: boolean to collapse inner content whitespace to a single space character
         literals: tuple of XML elements whose content should not be altered
+        register: boolean to register the nodes in the active node store
 
     Returns: the root Node of the Metapype model
 
     """
-    root = _process_element(etree.fromstring(xml.encode("utf-8")), clean, collapse, literals)
+    if isinstance(source, os.PathLike):
+        source = os.fspath(source)
+    e = etree.parse(source).getroot()
+    with _registration(register):
+        root = _process_element(e, clean, collapse, literals)
     return root
 
 
-def to_xml(node: Node, parent: Node = None, level: int = 0, skip_ns: bool = False) -> str:
-    xml = ""
+def from_xml_stream(
+    source,
+    clean: bool = True,
+    collapse: bool = False,
+    literals: tuple = (),
+    huge_tree: bool = False,
+    register: bool = True,
+) -> Node:
+    """
+    Convert an XML model into a Metapype model while parsing it incrementally. Nodes are
+    built as soon as their XML elements have been parsed, and the lxml elements are then
+    released, so that very large documents are never held as both a complete lxml tree
+    and a Metapype model. The resulting model is the same as that of from_xml().
+
+    Args:
+        source: file system path or binary file object of the XML document
+        clean: boolean to clean leading and trailing whitespace from node content
+        collapse: boolean to collapse inner content whitespace to a single space character
+        literals: tuple of XML elements whose content should not be altered
+        huge_tree: boolean to disable the libxml2 security restrictions on very deep
+            trees and very long text content
+        register: boolean to register the nodes in the active node store
+
+    Returns: the root Node of the Metapype model
+
+    """
+    if isinstance(source, os.PathLike):
+        source = os.fspath(source)
+    # Nodes of completed elements whose parent element has not yet ended; when an
+    # element ends, its children nodes are the last ones on the stack
+    nodes = []
+    with _registration(register):
+        for _, e in etree.iterparse(source, events=("end",), huge_tree=huge_tree):
+            node = _element_node(e, clean, collapse, literals, tail=False)
+            if len(e) > 0:
+                elements = [child for child in e if isinstance(child.tag, str)]
+                children = nodes[len(nodes) - len(elements):]
+                del nodes[len(nodes) - len(elements):]
+                for element, child in zip(elements, children):
+                    # The tail of an element is only complete once its parent has ended
+                    child.tail = _clean_text(element.tail, clean, collapse)
+                _add_children(node, children)
+            nodes.append(node)
+            e.clear(keep_tail=True)
+    return nodes.pop()
+
+
+def view(xml, clean: bool = True, collapse: bool = False, literals: tuple = ()) -> ElementView:
+    """
+    Parse an XML model into a read-only view of its lxml element tree (see ElementView),
+    which can be validated like the Metapype model that from_xml() would build, without
+    building it.
+
+    Args:
+        xml: XML string, bytes, memoryview, file object, or os.PathLike to be parsed, or
+            an lxml etree element
+        clean: boolean to clean leading and trailing whitespace from node content
+        collapse: boolean to collapse inner content whitespace to a single space character
+        literals: tuple of XML elements whose content should not be altered
+
+    Returns: the ElementView of the root element
+
+    """
+    if isinstance(xml, etree._Element):
+        e = xml
+    else:
+        e = _parse_xml(xml)
+    return ElementView(e, (clean, collapse, literals))
+
+
+def _xml_tags(node: Node, parent: Node, level: int, skip_ns: bool) -> tuple:
+    """
+    Returns the XML open and close tags (including content and tail) of a node
+    """
     spacing = "  "
     indent = spacing * level
 
     tag = f"{node.name}" if node.prefix is None else f"{node.prefix}:{node.name}"
 
     attributes = ""
-    if len(node.attributes) > 0:
+    if len(node.list_attributes()) > 0:
         attributes += " ".join([f"{k}=\"{v}\"" for k, v in node.attributes.items()])
 
     if not skip_ns:
@@ -288,7 +559,7 @@ def to_xml(node: Node, parent: Node = None, level: int = 0, skip_ns: bool = Fals
             if len(nsmap) > 0:
                 attributes += " " + " ".join([f"xmlns:{k}=\"{v}\"" for k, v in nsmap.items()])
 
-    if len(node.extras) > 0:
+    if len(node.list_extras()) > 0:
         attributes += " " + " ".join([f"{k}=\"{v}\"" for k, v in node.extras.items()])
 
     if len(attributes) > 0:
@@ -310,8 +581,81 @@ def to_xml(node: Node, parent: Node = None, level: int = 0, skip_ns: bool = Fals
         tail = escape(node.tail)
         close_tag += tail
 
-    xml += open_tag
-    for child in node.children:
-        xml += to_xml(child, node, level + 1, skip_ns)
-    xml += close_tag
-    return xml
+    return open_tag, close_tag
+
+
+def _xml_chunks(node: Node, parent: Node, level: int, skip_ns: bool) -> Iterator[str]:
+    """
+    Generate the XML of the model instance rooted at node as a sequence of string chunks
+    """
+    # The stack holds nodes still to be opened and the close tags of open nodes
+    stack = [(node, parent, level)]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, str):
+            yield item
+            continue
+        node, parent, level = item
+        open_tag, close_tag = _xml_tags(node, parent, level, skip_ns)
+        yield open_tag
+        stack.append(close_tag)
+        stack.extend((child, node, level + 1) for child in reversed(node.children))
+
+
+def _is_binary(out) -> bool:
+    if isinstance(out, io.TextIOBase):
+        return False
+    if isinstance(out, (io.RawIOBase, io.BufferedIOBase)):
+        return True
+    return "b" in getattr(out, "mode", "")
+
+
+def write_chunks(chunks: Iterable[str], out, buffer_size: int = WRITE_BUFFER_SIZE) -> None:
+    """
+    Write string chunks to a text or binary file-like object. Chunks are gathered into
+    writes of about buffer_size characters; for a binary stream, they are encoded to
+    UTF-8 incrementally.
+
+    Args:
+        chunks: iterable of strings
+        out: text or binary file-like object with a write() method
+        buffer_size: approximate number of characters per write
+
+    Returns: None
+
+    """
+    encoder = codecs.getincrementalencoder("utf-8")() if _is_binary(out) else None
+    buffer = []
+    size = 0
+    for chunk in chunks:
+        buffer.append(chunk)
+        size += len(chunk)
+        if size >= buffer_size:
+            text = "".join(buffer)
+            out.write(text if encoder is None else encoder.encode(text))
+            buffer.clear()
+            size = 0
+    text = "".join(buffer)
+    out.write(text if encoder is None else encoder.encode(text, final=True))
+
+
+def to_xml(node: Node, parent: Node = None, level: int = 0, skip_ns: bool = False, out=None):
+    """
+    Convert a Metapype model instance into XML. The XML is generated as a sequence of
+    chunks that are either joined once into the returned string or written to out.
+
+    Args:
+        node: root node of the model instance
+        parent: parent node of node, used to determine namespace declarations
+        level: indentation level of node
+        skip_ns: boolean to omit namespace declarations
+        out: optional text or binary file-like object to write the XML to; a binary
+            stream receives UTF-8 encoded bytes
+
+    Returns: the XML string, or None if out is given
+
+    """
+    chunks = _xml_chunks(node, parent, level, skip_ns)
+    if out is None:
+        return "".join(chunks)
+    write_chunks(chunks, out)
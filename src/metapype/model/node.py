@@ -33,11 +33,22 @@ from contextlib import contextmanager
 from contextvars import ContextVar
 import copy
 from enum import Enum
+import itertools
 import json
+import os
+import secrets
+import types
+from typing import Callable, Iterable
 import uuid
+import weakref
 
 import daiquiri
 
+from metapype.model import changes
+from metapype.model import query
+from metapype.model.index import TreeIndex, indexes_active
+from metapype.model import traverse
+
 
 logger = daiquiri.getLogger("node.py: " + __name__)
 
@@ -48,11 +59,96 @@ class Shift(Enum):
 
 _default_store = {}  # Provides backward-compatibility with previous versions of node.py
 
-_node_store: ContextVar[dict] = ContextVar("node_store", default=_default_store)
+# Without a default, so that the store used by contexts that never set one is looked up
+# in _default_store when needed (see Node.set_default_store())
+_node_store: ContextVar[dict | None] = ContextVar("node_store")
+
+
+class WeakNodeStore(weakref.WeakValueDictionary):
+    """
+    Node store that holds nodes by weak reference: a node is dropped from the store once
+    its model is no longer referenced elsewhere, so that a long-lived store does not keep
+    every model ever created alive. The high_water_mark attribute records the largest
+    number of nodes held at once.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.high_water_mark = len(self)
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        size = len(self)
+        if size > self.high_water_mark:
+            self.high_water_mark = size
+
+# Shared, immutable stand-in for the attributes and extras of nodes that have none; a
+# node's own dict is only allocated when it is first accessed or modified
+_EMPTY = types.MappingProxyType({})
+
+
+def uuid1_id() -> str:
+    """
+    Returns a time-based UUID string; the default node identifier
+    """
+    return str(uuid.uuid1())
+
+
+class CounterId(object):
+    """
+    Callable node identifier factory that returns "<prefix>-<n>", where n is a
+    process-local monotonic counter and prefix is a random hex string drawn once per
+    process (and again in a forked child), so identifiers remain unique across the
+    processes of a worker pool without a clock read or lock per node.
+    """
+
+    def __init__(self):
+        self._reset()
+        _counter_ids.add(self)
+
+    def _reset(self):
+        self._prefix = secrets.token_hex(8)
+        self._count = itertools.count(1)
+
+    def __call__(self) -> str:
+        return f"{self._prefix}-{next(self._count)}"
+
+
+# Counter factories to be reset in a forked child, held by weak reference so that a
+# factory that is no longer used is not kept alive by the fork hook
+_counter_ids = weakref.WeakSet()
+
+
+def _reset_counter_ids():
+    for counter_id in list(_counter_ids):
+        counter_id._reset()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_counter_ids)
+
+
+_id_factory: Callable[[], str] = uuid1_id
+_lazy_ids = False
 
 
 class Node(object):
 
+    __slots__ = (
+        "_id",
+        "_name",
+        "_parent",
+        "_content",
+        "_tail",
+        "_attributes",
+        "_nsmap",
+        "_prefix",
+        "_extras",
+        "_children",
+        "_index",
+        "__weakref__",
+    )
+
     def __init__(self, name: str, id: str = None, parent=None, content: str = None):
         """
         Model node class representation.
@@ -64,16 +160,20 @@ class Node(object):
             content: Optional string content
         """
 
-        self._id = str(uuid.uuid1()) if id is None else id
+        if id is None:
+            self._id = None if _lazy_ids else _id_factory()
+        else:
+            self._id = id
         self._name = name
         self._parent = parent
         self._content = None if content is None else str(content)
         self._tail = None
-        self._attributes = {}
+        self._attributes = _EMPTY
         self._nsmap = {}
         self._prefix = None
-        self._extras = {}
+        self._extras = _EMPTY
         self._children = []
+        self._index = None
         Node.set_node_instance(self)
 
     def __str__(self):
@@ -86,13 +186,13 @@ class Node(object):
 
     def __object(self):
         o = {self._name: []}
-        o[self._name].append({"id": self._id})
+        o[self._name].append({"id": self.id})
         o[self._name].append({"parent": self._parent.name if self._parent else None})
         o[self._name].append({"parent_id": self._parent.id if self._parent else None})
         o[self._name].append({"nsmap": self._nsmap})
         o[self._name].append({"prefix": self._prefix})
-        o[self._name].append({"attributes": self._attributes})
-        o[self._name].append({"extras": self._extras})
+        o[self._name].append({"attributes": dict(self._attributes)})
+        o[self._name].append({"extras": dict(self._extras)})
         o[self._name].append({"content": self._content})
         o[self._name].append({"tail": self._tail})
         children = []
@@ -102,19 +202,73 @@ class Node(object):
         return o
 
     @classmethod
-    def _store(cls) -> dict:
+    def set_id_factory(cls, factory: Callable[[], str] = None, lazy: bool = False):
+        """
+        Sets the strategy used to assign identifiers to new nodes (and copies) that are
+        not given an explicit identifier.
+
+        Args:
+            factory: callable returning a new unique identifier string; uuid1_id()
+                     if None. CounterId() is a faster process-local alternative.
+            lazy: if True, an identifier is only minted when the node's id is first
+                  read, which includes registering the node in a node store
+
+        Returns:
+            None
+        """
+        global _id_factory, _lazy_ids
+        _id_factory = uuid1_id if factory is None else factory
+        _lazy_ids = lazy
+
+    @classmethod
+    def _store(cls) -> dict | None:
         """
         Allows class methods to access the correct node store for the current context.
 
         Returns:
-            reference to the node store
+            reference to the node store, or None if nodes are not registered
         """
-        return _node_store.get()
+        return _node_store.get(_default_store)
 
     @classmethod
-    def use_store(cls, store: dict):
+    def set_default_store(cls, store: dict | None) -> dict | None:
         """
-        Set the active store for the current execution context.
+        Set the store used by every execution context that has not set its own store
+        with use_store() or store_scope(); e.g., Node.set_default_store(WeakNodeStore())
+        at start-up keeps unscoped models from accumulating in a long-running process.
+
+        Returns:
+            the previous default store
+        """
+        global _default_store
+        previous = _default_store
+        _default_store = store
+        return previous
+
+    @classmethod
+    def store_stats(cls) -> dict:
+        """
+        Returns statistics of the node store of the current context.
+
+        Returns:
+            dict with the number of nodes held ("size"), the largest number held at once
+            ("high_water_mark"; None if the store does not track it), and whether nodes
+            are held by weak reference ("weak")
+        """
+        store = cls._store()
+        if store is None:
+            return {"size": 0, "high_water_mark": None, "weak": False}
+        return {
+            "size": len(store),
+            "high_water_mark": getattr(store, "high_water_mark", None),
+            "weak": isinstance(store, weakref.WeakValueDictionary),
+        }
+
+    @classmethod
+    def use_store(cls, store: dict | None):
+        """
+        Set the active store for the current execution context. If store is None, new
+        nodes are not registered in any store (see store_scope()).
 
         Returns:
             a token that can be used to reset the store.
@@ -142,7 +296,10 @@ class Node(object):
         Returns:
             Node
         """
-        return cls._store().get(id)
+        store = cls._store()
+        if store is None:
+            return None
+        return store.get(id)
 
     @classmethod
     def set_node_instance(cls, node: "Node"):
@@ -155,21 +312,39 @@ class Node(object):
         Returns:
             None
         """
-        cls._store()[node.id] = node
+        store = cls._store()
+        if store is not None:
+            store[node.id] = node
 
     @classmethod
     @contextmanager
-    def store_scope(cls, store: dict | None = None, *, clear_on_exit: bool = True):
+    def store_scope(
+        cls, store: dict | None = None, *, clear_on_exit: bool = True, register: bool = True, weak: bool = False
+    ):
         """
         Context manager to scope Node storage to a unit of work (request/job/etc).
         For examples of its use, see unit tests in test_node_store_scope.py.
 
+        With register set to False, nodes created within the scope are not registered
+        in any store: get_node_instance() finds nothing, and a model is garbage
+        collected as soon as it is no longer referenced. Use Node.id_index() to look up
+        nodes of such a model by identifier.
+
         Args:
             store: dict to use. If None, a new dict is created.
             clear_on_exit: if True, clears the scoped store on exit to avoid leaks.
+            register: if False, no store is used and None is yielded.
+            weak: if True and store is None, a new WeakNodeStore is used.
         """
+        if not register:
+            token = cls.use_store(None)
+            try:
+                yield None
+            finally:
+                cls.reset_store(token)
+            return
         if store is None:
-            store = {}
+            store = WeakNodeStore() if weak else {}
         token = cls.use_store(store)
         try:
             yield store
@@ -193,12 +368,42 @@ class Node(object):
             None
         """
         store = cls._store()
-        if children:
-            node = cls.get_node_instance(id)
-            for child in node.children:
-                cls.delete_node_instance(child.id)
+        if store is None:
+            return
+        node = store.get(id) if children else None
+        if node is not None:
+            cls.delete_node_instances((node,))
         store.pop(id, None) # defensive: avoids KeyError if already removed
 
+    @classmethod
+    def delete_node_instances(cls, nodes: Iterable["Node"], return_ids: bool = False) -> list | None:
+        """
+        Removes the nodes and all of their descendants from the store, walking each
+        subtree once.
+
+        Args:
+            nodes: iterable of the root nodes of the subtrees to remove
+            return_ids: bool
+
+        Returns:
+            List of the identifiers removed from the store if return_ids is True,
+            otherwise None
+        """
+        store = cls._store()
+        removed = [] if return_ids else None
+        if store is None:
+            return removed
+        pop = store.pop
+        for node in nodes:
+            stack = [node]
+            while stack:
+                node = stack.pop()
+                stack.extend(node._children)
+                # A node without an identifier has never been registered
+                if node._id is not None and pop(node._id, None) is not None and return_ids:
+                    removed.append(node._id)
+        return removed
+
     @classmethod
     def fix_nsmap(cls, node: "Node", nsmap: dict = None, nsmap_id: int = None) -> None:
         """
@@ -212,26 +417,31 @@ class Node(object):
         Returns:
             None
         """
-        if nsmap is not None:
-            if nsmap_id is None:
-                nsmap_id = id(node.nsmap)
-            if nsmap == node.nsmap:
-                node.nsmap = nsmap
-            else:
-                for prefix in nsmap:
-                    if prefix not in node.nsmap:
-                        node.nsmap = copy.deepcopy(node.nsmap)
-                    node.nsmap[prefix] = nsmap[prefix]
-
-        for child in node.children:
-            if id(child.nsmap) == nsmap_id:
-                child.nsmap = node.nsmap
-                cls.fix_nsmap(child, node.nsmap, nsmap_id=nsmap_id)
-            else:
-                cls.fix_nsmap(child, node.nsmap)
+        # Depth-first with an explicit stack of (node, parent nsmap, nsmap_id)
+        stack = [(node, nsmap, nsmap_id)]
+        while stack:
+            node, nsmap, nsmap_id = stack.pop()
+            if nsmap is not None:
+                if nsmap_id is None:
+                    nsmap_id = id(node.nsmap)
+                if nsmap == node.nsmap:
+                    node.nsmap = nsmap
+                else:
+                    for prefix in nsmap:
+                        if prefix not in node.nsmap:
+                            node.nsmap = copy.deepcopy(node.nsmap)
+                        node.nsmap[prefix] = nsmap[prefix]
+
+            for child in reversed(node.children):
+                if id(child.nsmap) == nsmap_id:
+                    child.nsmap = node.nsmap
+                    stack.append((child, node.nsmap, nsmap_id))
+                else:
+                    stack.append((child, node.nsmap, None))
 
     def add_attribute(self, name, value):
-        self._attributes[name] = value
+        self.attributes[name] = value
+        self._notify()
 
     def add_child(self, child, index=None) -> None:
         """
@@ -250,6 +460,8 @@ class Node(object):
         else:
             self._children.insert(index, child)
             child.parent = self
+        self._touch()
+        self._notify(added=(child,))
 
         if self.nsmap == child.nsmap:
             child.nsmap = self.nsmap
@@ -259,23 +471,27 @@ class Node(object):
                     child.add_namespace(prefix, self.nsmap[prefix])
 
     def add_extras(self, key: str, value: str):
-        self._extras[key] = value
+        self.extras[key] = value
 
     def add_namespace(self, prefix: str, namespace: str, nsmap_id: int = None):
-        if nsmap_id is None:
-            nsmap_id = id(self.nsmap)
-        if prefix in self.nsmap:
-            self.nsmap[prefix] = namespace
-        else:
-            self.nsmap = copy.deepcopy(self.nsmap)
-            self.nsmap[prefix] = namespace
-
-        for child in self._children:
-            if id(child.nsmap) == nsmap_id:
-                child.nsmap = self.nsmap
-                child.add_namespace(prefix, namespace, nsmap_id=nsmap_id)
+        # Depth-first with an explicit stack of (node, nsmap_id)
+        stack = [(self, nsmap_id)]
+        while stack:
+            node, nsmap_id = stack.pop()
+            if nsmap_id is None:
+                nsmap_id = id(node.nsmap)
+            if prefix in node.nsmap:
+                node.nsmap[prefix] = namespace
             else:
-                child.add_namespace(prefix, namespace)
+                node.nsmap = copy.deepcopy(node.nsmap)
+                node.nsmap[prefix] = namespace
+
+            for child in reversed(node._children):
+                if id(child.nsmap) == nsmap_id:
+                    child.nsmap = node.nsmap
+                    stack.append((child, nsmap_id))
+                else:
+                    stack.append((child, None))
 
     def attribute_value(self, name):
         if name in self._attributes:
@@ -284,11 +500,14 @@ class Node(object):
 
     @property
     def attributes(self):
+        if self._attributes is _EMPTY:
+            self._attributes = {}
         return self._attributes
 
     @attributes.setter
     def attributes(self, attributes):
         self._attributes = attributes
+        self._notify()
 
     def child_index(self, child):
         """
@@ -315,7 +534,10 @@ class Node(object):
 
     @children.setter
     def children(self, children):
+        removed = self._children
         self._children = children
+        self._touch()
+        self._notify(added=children, removed=removed)
 
     @property
     def content(self):
@@ -324,6 +546,7 @@ class Node(object):
     @content.setter
     def content(self, content):
         self._content = None if content is None else str(content)
+        self._notify()
 
     def copy(self):
         """
@@ -333,30 +556,45 @@ class Node(object):
             Node
 
         """
+        _copy = self._copy_node()
+        # Copy descendants with an explicit stack rather than recursion
+        stack = [(self, _copy)]
+        while stack:
+            node, node_copy = stack.pop()
+            for child in node.children:
+                _child_copy = child._copy_node()
+                _child_copy.parent = node_copy
+                node_copy.children.append(_child_copy)
+                stack.append((child, _child_copy))
+        return _copy
+
+    def _copy_node(self):
+        """
+        Returns a copy of the node, without its children, that is given a new node ID.
+
+        Returns:
+            Node
+        """
         # Make a shallow copy and give it a new ID
         _copy = copy.copy(self)
-        _copy._id = str(uuid.uuid1())
+        _copy._id = None if _lazy_ids else _id_factory()
         Node.set_node_instance(_copy)
         # Construct the attributes dictionary so it's not just a reference to self's version
-        _copy.attributes = {}
-        for key, val in self.attributes.items():
-            _copy.attributes[key] = val
+        _copy._attributes = dict(self._attributes) if self._attributes else _EMPTY
         _copy.nsmap = {}
         for key, val in self.nsmap.items():
             _copy.nsmap[key] = val
-        _copy.extras = {}
-        for key, val in self.extras.items():
-            _copy.extras[key] = val
-        # Construct the children list so it's not just a reference to self's version
-        _copy.children = []
-        for child in self.children:
-            _child_copy = child.copy()
-            _child_copy.parent = _copy
-            _copy.children.append(_child_copy)
+        _copy._extras = dict(self._extras) if self._extras else _EMPTY
+        _copy._index = None
+        # Construct the children list so it's not just a reference to self's version; set
+        # directly, as neither the copy nor the tree of self is changed
+        _copy._children = []
         return _copy
 
     @property
     def extras(self):
+        if self._extras is _EMPTY:
+            self._extras = {}
         return self._extras
 
     @extras.setter
@@ -390,26 +628,109 @@ class Node(object):
             child_name: Child name to be matched
             descendants: List object to be filled with descendant nodes
         """
-        for child_node in self._children:
-            if child_node.name == child_name:
-                descendants.append(child_node)
-            child_node.find_all_descendants(child_name, descendants)
+        tree_index = self._find_index()
+        if tree_index is not None:
+            found = tree_index.find_descendants(self, child_name)
+            if found is not None:
+                descendants.extend(found)
+                return
+        for descendant in traverse.descendants(self):
+            if descendant.name == child_name:
+                descendants.append(descendant)
 
     @property
     def id(self):
         """
-        Returns the unique identifier of the node instance
+        Returns the unique identifier of the node instance, minting it first if
+        identifiers are assigned lazily
         Returns:
             Str
         """
+        if self._id is None:
+            self._id = _id_factory()
         return self._id
 
+    def build_index(self) -> TreeIndex:
+        """
+        Attaches an index of the subtree rooted at this node, which path queries
+        from this node (e.g., find_all_nodes_by_path()) then use. The index is built
+        on first use, and rebuilt on the first use after the subtree is changed
+        through the methods of Node; direct changes to a children list are not seen.
+
+        Returns:
+            TreeIndex
+        """
+        if self._index is None:
+            self._index = TreeIndex(self)
+        return self._index
+
+    def drop_index(self) -> None:
+        """
+        Detaches the index of this node, if any
+        """
+        if self._index is not None:
+            self._index.detach()
+            self._index = None
+
+    @property
+    def tree_index(self):
+        """
+        Returns the index attached to this node, or None
+        """
+        return self._index
+
+    def _find_index(self):
+        """
+        Returns the index attached to this node or its nearest indexed ancestor, or None
+        """
+        if indexes_active():
+            node = self
+            while node is not None:
+                if node._index is not None:
+                    return node._index
+                node = node._parent
+        return None
+
+    def _notify(self, added: Iterable = (), removed: Iterable = (), reordered: bool = False) -> None:
+        """
+        Notes a change of the name, content, attributes, or children of this node, and
+        the children added, removed, or reordered by it, for the change watchers of its
+        tree (see metapype.model.changes)
+        """
+        if changes.watching():
+            changes.notify(self, added, removed, reordered)
+
+    def _touch(self) -> None:
+        """
+        Notes a change of the subtree rooted at this node: indexes attached to the
+        node and its ancestors become stale.
+        """
+        if indexes_active():
+            node = self
+            while node is not None:
+                if node._index is not None:
+                    node._index.invalidate()
+                node = node._parent
+
+    def id_index(self) -> dict:
+        """
+        Builds an index of the subtree rooted at this node, independent of any node
+        store; e.g., for models created without registration.
+
+        Returns:
+            Dict of node identifier to Node
+        """
+        return {node.id: node for node in traverse.pre_order(self)}
+
     def list_attributes(self):
         return list(self._attributes.keys())
 
+    def list_extras(self):
+        return list(self._extras.keys())
+
     def find_descendant(self, descendant_name):
         """
-        Recursively searches for the first descendant that matches the
+        Searches (in document order) for the first descendant that matches the
         descendant_name and returns it, or returns None if there is no
         match.
 
@@ -419,15 +740,15 @@ class Node(object):
         Returns
             Node or None
         """
-        descendant = None
-        for descendant_node in self._children:
+        tree_index = self._find_index()
+        if tree_index is not None:
+            found = tree_index.find_descendants(self, descendant_name)
+            if found is not None:
+                return found[0] if found else None
+        for descendant_node in traverse.descendants(self):
             if descendant_node.name == descendant_name:
-                descendant = descendant_node
-            else:
-                descendant = descendant_node.find_descendant(descendant_name=descendant_name)
-            if descendant:
-                break
-        return descendant
+                return descendant_node
+        return None
 
     def find_child(self, child_name):
         """
@@ -469,12 +790,7 @@ class Node(object):
         """
         if not path or len(path) == 0:
             return None
-        current_node = self
-        for name in path:
-            if not current_node:
-                return None
-            current_node = current_node.find_child(name)
-        return current_node
+        return query.compile(path).find_first(self)
 
     def find_all_nodes_by_path(self, path: list):
         """
@@ -498,15 +814,7 @@ class Node(object):
         """
         if not path or len(path) == 0:
             return []
-        current_list = [self]
-        for name in path:
-            if not current_list:
-                return []
-            next_generation = []
-            for node in current_list:
-                next_generation.extend(node.find_all_children(name))
-            current_list = next_generation
-        return current_list
+        return query.compile(path).find_all(self)
 
     def get_ancestry(self):
         ancestry = []
@@ -520,50 +828,41 @@ class Node(object):
 
     @staticmethod
     def is_equal(node1, node2) -> bool:
-        if id(node1) == id(node2):
-            return False
-        if node1.name != node2.name:
-            return False
-        if node1.content != node2.content:
-            return False
-        if node1.tail != node2.tail:
-            return False
-        if len(node1.attributes) != len(node2.attributes):
-            return False
-        else:
-            for key in node1.attributes.keys():
-                try:
-                    if node1.attributes[key] != node2.attributes[key]:
-                        return False
-                except KeyError:
-                    return False
-        if len(node1.nsmap) != len(node2.nsmap):
-            return False
-        else:
-            for key in node1.nsmap.keys():
-                try:
-                    if node1.nsmap[key] != node2.nsmap[key]:
-                        return False
-                except KeyError:
-                    return False
-        if node1.prefix != node2.prefix:
-            return False
-        if len(node1.extras) != len(node2.extras):
-            return False
-        else:
-            for key in node1.extras.keys():
-                try:
-                    if node1.extras[key] != node2.extras[key]:
-                        return False
-                except KeyError:
-                    return False
-        if len(node1.children) != len(node2.children):
-            return False
-        else:
-            for index in range(len(node1.children)):
-                child1 = node1.children[index]
-                child2 = node2.children[index]
-                return Node.is_equal(child1, child2)
+        """
+        Returns True if two distinct nodes have the same name, content, tail,
+        attributes, namespace map, prefix, and extras, and their children are equal
+        in turn
+
+        Args:
+            node1: Node
+            node2: Node
+
+        Returns:
+            Boolean
+        """
+        # Pairs of nodes to be compared, with an explicit stack rather than recursion
+        stack = [(node1, node2)]
+        while stack:
+            node1, node2 = stack.pop()
+            if id(node1) == id(node2):
+                return False
+            if node1.name != node2.name:
+                return False
+            if node1.content != node2.content:
+                return False
+            if node1.tail != node2.tail:
+                return False
+            if node1._attributes != node2._attributes:
+                return False
+            if node1.nsmap != node2.nsmap:
+                return False
+            if node1.prefix != node2.prefix:
+                return False
+            if node1._extras != node2._extras:
+                return False
+            if len(node1.children) != len(node2.children):
+                return False
+            stack.extend(zip(reversed(node1.children), reversed(node2.children)))
         return True
 
     @property
@@ -573,6 +872,9 @@ class Node(object):
     @name.setter
     def name(self, name):
         self._name = name
+        self._touch()
+        # The rule of the node, and so the validity of its subtree, may have changed
+        (self if self._parent is None else self._parent)._notify(added=(self,))
 
     @property
     def nsmap(self):
@@ -603,7 +905,8 @@ class Node(object):
         self._prefix = prefix
 
     def remove_attribute(self, name):
-        del self._attributes[name]
+        del self.attributes[name]
+        self._notify()
 
     def remove_child(self, child):
         """
@@ -616,23 +919,32 @@ class Node(object):
             None
         """
         self._children.remove(child)
+        self._touch()
+        self._notify(removed=(child,))
 
     def remove_children(self):
+        removed = self._children
         self._children = []
+        self._touch()
+        self._notify(removed=removed)
 
     def remove_namespace(self, prefix: str, nsmap_id: int = None) -> None:
-        if nsmap_id is None:
-            nsmap_id = id(self.nsmap)
-        if prefix in self.nsmap:
-            self.nsmap = copy.deepcopy(self.nsmap)
-            del self.nsmap[prefix]
+        # Depth-first with an explicit stack of (node, nsmap_id)
+        stack = [(self, nsmap_id)]
+        while stack:
+            node, nsmap_id = stack.pop()
+            if nsmap_id is None:
+                nsmap_id = id(node.nsmap)
+            if prefix in node.nsmap:
+                node.nsmap = copy.deepcopy(node.nsmap)
+                del node.nsmap[prefix]
 
-        for child in self._children:
-            if id(child.nsmap) == nsmap_id:
-                child.nsmap = self.nsmap
-                child.remove_namespace(prefix, nsmap_id=nsmap_id)
-            else:
-                child.remove_namespace(prefix)
+            for child in reversed(node._children):
+                if id(child.nsmap) == nsmap_id:
+                    child.nsmap = node.nsmap
+                    stack.append((child, nsmap_id))
+                else:
+                    stack.append((child, None))
 
     def replace_child(self, old_child: "Node", new_child: "Node", delete_old: bool = True):
         """
@@ -652,6 +964,8 @@ class Node(object):
 
         new_child.parent = self
         self._children[self._children.index(old_child)] = new_child
+        self._touch()
+        self._notify(added=(new_child,), removed=(old_child,))
         if delete_old:
             Node.delete_node_instance(id=old_child.id)
 
@@ -706,13 +1020,16 @@ class Node(object):
             msg = "Expected direction to be either Shift.RIGHT or Shift.LEFT"
             raise ValueError(msg)
 
+        self._touch()
+        self._notify(reordered=True)
         return index
 
     def set_nsmap(self, nsmap: dict, children: bool = True):
-        self.nsmap = nsmap
-        if children:
-            for child in self.children:
-                child.set_nsmap(nsmap, children)
+        if not children:
+            self.nsmap = nsmap
+            return
+        for node in traverse.pre_order(self):
+            node.nsmap = nsmap
 
     @property
     def tail(self) -> str:
@@ -0,0 +1,111 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+:Mod: query
+
+:Synopsis:
+    Compiled name-path queries over Metapype model trees. A path such as
+    "dataset/creator/userId" (or the equivalent list of names) is parsed once
+    by compile() and can then be evaluated against any node, using the node's
+    index if one has been built (see Node.build_index()).
+
+:Author:
+    agent
+
+:Created:
+    10/17/26
+"""
+import functools
+
+import daiquiri
+
+
+logger = daiquiri.getLogger(__name__)
+
+
+class PathQuery(object):
+    """
+    Compiled name-path query; names are matched against successive generations of
+    descendants of the node the query is evaluated on.
+    """
+
+    __slots__ = ("_names",)
+
+    def __init__(self, names: tuple):
+        self._names = names
+
+    def __repr__(self):
+        return f"PathQuery({'/'.join(self._names)!r})"
+
+    @property
+    def names(self) -> tuple:
+        return self._names
+
+    def find_all(self, node) -> list:
+        """
+        Returns the nodes that satisfy the path below node, in document order
+
+        Args:
+            node: Node the path is relative to
+
+        Returns:
+            List of Nodes, which may be empty
+        """
+        if len(self._names) == 0:
+            return []
+        tree_index = node.tree_index
+        if tree_index is not None:
+            return tree_index.find_all(self._names)
+        current = [node]
+        for name in self._names:
+            current = [child for parent in current for child in parent.children if child.name == name]
+            if not current:
+                break
+        return current
+
+    def find_first(self, node):
+        """
+        Returns the node found by following the first child of each name along the path
+
+        Args:
+            node: Node the path is relative to
+
+        Returns:
+            Node or None
+        """
+        if len(self._names) == 0:
+            return None
+        tree_index = node.tree_index
+        if tree_index is not None:
+            return tree_index.find_first(self._names)
+        current = node
+        for name in self._names:
+            current = current.find_child(name)
+            if current is None:
+                break
+        return current
+
+
+@functools.lru_cache(maxsize=1024)
+def _compile(names: tuple) -> PathQuery:
+    return PathQuery(names)
+
+
+def compile(path) -> PathQuery:
+    """
+    Compiles a name-path into a reusable query; compiled queries are cached.
+
+    Args:
+        path: string of node names separated by "/", or a list or tuple of node names
+
+    Returns:
+        PathQuery
+    """
+    if isinstance(path, PathQuery):
+        return path
+    if isinstance(path, str):
+        names = tuple(name for name in path.split("/") if name)
+    else:
+        names = tuple(path)
+    return _compile(names)
@@ -0,0 +1,112 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+:Mod: traverse
+
+:Synopsis:
+    Iterative (explicit stack) traversal of Metapype model trees. Walking a tree
+    with these generators avoids Python frame overhead per node and never raises
+    RecursionError, regardless of the depth of the model.
+
+:Author:
+    agent
+
+:Created:
+    10/17/26
+"""
+from typing import Callable, Iterator
+
+import daiquiri
+
+
+logger = daiquiri.getLogger(__name__)
+
+START = 0
+END = 1
+
+
+def pre_order(node, descend: Callable = None) -> Iterator:
+    """
+    Generate the nodes of the tree rooted at node in document (pre-)order.
+
+    Children of a node are collected only after the node has been yielded, so
+    the consumer may modify the children of the current node before they are
+    visited.
+
+    Args:
+        node: Root node of the traversal
+        descend: Optional predicate; children of a node are visited only if
+                 descend(node) is true
+
+    Returns:
+        Iterator of nodes
+    """
+    stack = [node]
+    pop = stack.pop
+    extend = stack.extend
+    while stack:
+        node = pop()
+        yield node
+        if descend is None or descend(node):
+            extend(reversed(node.children))
+
+
+def descendants(node, descend: Callable = None) -> Iterator:
+    """
+    Generate the descendants of node (excluding node itself) in document order.
+
+    Args:
+        node: Node whose descendants are generated
+        descend: Optional predicate as in pre_order()
+
+    Returns:
+        Iterator of nodes
+    """
+    walker = pre_order(node, descend)
+    next(walker)
+    return walker
+
+
+def post_order(node) -> Iterator:
+    """
+    Generate the nodes of the tree rooted at node in post-order; i.e., a node is
+    generated after all of its descendants.
+
+    Args:
+        node: Root node of the traversal
+
+    Returns:
+        Iterator of nodes
+    """
+    stack = [(node, False)]
+    while stack:
+        node, expanded = stack.pop()
+        if expanded:
+            yield node
+        else:
+            stack.append((node, True))
+            stack.extend((child, False) for child in reversed(node.children))
+
+
+def walk(node, descend: Callable = None) -> Iterator:
+    """
+    Generate (event, node, depth) tuples for the tree rooted at node, where event
+    is START when a node is entered and END after all of its descendants have been
+    generated. The depth of the root node is 0.
+
+    Args:
+        node: Root node of the traversal
+        descend: Optional predicate as in pre_order()
+
+    Returns:
+        Iterator of (event, node, depth) tuples
+    """
+    stack = [(START, node, 0)]
+    while stack:
+        event, node, depth = stack.pop()
+        yield event, node, depth
+        if event == START:
+            stack.append((END, node, depth))
+            if descend is None or descend(node):
+                stack.extend((START, child, depth + 1) for child in reversed(node.children))
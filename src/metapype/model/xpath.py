@@ -0,0 +1,374 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+:Mod: xpath
+
+:Synopsis:
+    A small XPath subset for selecting nodes of Metapype model trees. Supported are
+    absolute ("/eml/dataset") and relative ("dataset/creator", ".//para") location
+    paths, the child ("/") and descendant ("//") axes, name tests (a namespace
+    prefix is accepted and ignored) and "*", and predicates:
+
+        [@id]              node has the attribute
+        [@system='edi']    attribute equals (or with "!=", differs from) a literal
+        [2], [last()]      position among the nodes selected from the same parent
+
+    For example, "//dataTable[2]/physical/size" or "/eml/dataset/creator[@id]/userId".
+    Expressions are compiled once and cached. Paths of plain child steps are evaluated
+    through metapype.model.query, and descendant steps through Node.find_all_descendants(),
+    so both use an index attached to the tree (see Node.build_index()).
+
+:Author:
+    agent
+
+:Created:
+    10/17/26
+"""
+import functools
+import re
+
+import daiquiri
+
+from metapype.model import query
+from metapype.model import traverse
+
+
+logger = daiquiri.getLogger(__name__)
+
+CHILD = 0
+DESCENDANT = 1
+SELF = 2
+
+_TOKENS = re.compile(
+    r"""\s*(?:
+        (?P<axis>//|/)
+        |(?P<step>\.(?!\.))
+        |(?P<name>\*|(?:[A-Za-z_][\w.\-]*:)?[A-Za-z_][\w.\-]*)
+        |\[\s*(?P<predicate>[^\]]*?)\s*\]
+    )""",
+    re.VERBOSE,
+)
+
+_PREDICATE = re.compile(
+    r"""^(?:
+        (?P<position>\d+)
+        |(?P<last>last\(\s*\))
+        |@(?P<attribute>[A-Za-z_][\w.\-:]*)\s*(?:(?P<op>!=|=)\s*(?:'(?P<single>[^']*)'|"(?P<double>[^"]*)"))?
+    )$""",
+    re.VERBOSE,
+)
+
+
+class _Document(object):
+    """
+    Stand-in for the XML document node, the parent of the root node, from which
+    absolute paths are evaluated
+    """
+
+    __slots__ = ("children",)
+
+    def __init__(self, root):
+        self.children = [root]
+
+
+def _parse_predicate(text: str, expression: str) -> tuple:
+    match = _PREDICATE.match(text)
+    if match is None:
+        msg = f'Unsupported predicate "[{text}]" in XPath expression "{expression}"'
+        raise ValueError(msg)
+    if match.group("position") is not None:
+        position = int(match.group("position"))
+        if position < 1:
+            msg = f'Position must be 1 or greater in XPath expression "{expression}"'
+            raise ValueError(msg)
+        return "position", position
+    if match.group("last") is not None:
+        return "last", None
+    value = match.group("single") if match.group("single") is not None else match.group("double")
+    return match.group("op") or "@", (match.group("attribute"), value)
+
+
+def _parse(expression: str) -> tuple:
+    """
+    Parses an XPath expression into (absolute, steps), where each step is a tuple of
+    (axis, name, predicates); name is None for "*". A leading "." step is dropped.
+    """
+    steps = []
+    absolute = False
+    axis = None
+    position = 0
+    length = len(expression.rstrip())
+    while position < length:
+        match = _TOKENS.match(expression, position)
+        if match is None:
+            msg = f'Invalid XPath expression "{expression}" at position {position}'
+            raise ValueError(msg)
+        position = match.end()
+        if match.group("axis") is not None:
+            if axis is not None:
+                msg = f'Missing step in XPath expression "{expression}"'
+                raise ValueError(msg)
+            if len(steps) == 0:
+                absolute = True
+            axis = DESCENDANT if match.group("axis") == "//" else CHILD
+        elif match.group("predicate") is not None:
+            if len(steps) == 0 or axis is not None or steps[-1][0] == SELF:
+                msg = f'Misplaced predicate in XPath expression "{expression}"'
+                raise ValueError(msg)
+            steps[-1][2].append(_parse_predicate(match.group("predicate"), expression))
+        else:
+            if len(steps) > 0 and axis is None:
+                msg = f'Missing "/" in XPath expression "{expression}"'
+                raise ValueError(msg)
+            if match.group("step") is not None:
+                if axis is not None:
+                    msg = f'"." must be the first step of XPath expression "{expression}"'
+                    raise ValueError(msg)
+                steps.append((SELF, None, []))
+            else:
+                name = match.group("name")
+                name = None if name == "*" else name[name.find(":") + 1:]
+                steps.append((CHILD if axis is None else axis, name, []))
+            axis = None
+    if axis is not None or (len(steps) == 0 and not absolute):
+        msg = f'Incomplete XPath expression "{expression}"'
+        raise ValueError(msg)
+    return absolute, tuple((axis, name, tuple(predicates)) for axis, name, predicates in steps if axis != SELF)
+
+
+def apply_predicates(nodes: list, predicates: tuple) -> list:
+    """
+    Applies compiled predicates in turn to nodes selected from the same parent
+
+    Args:
+        nodes: list of sibling Nodes, in document order
+        predicates: tuple of compiled predicates of a step (see XPath.steps)
+
+    Returns:
+        List of the Nodes that satisfy the predicates
+    """
+    for kind, argument in predicates:
+        if kind == "position":
+            nodes = nodes[argument - 1:argument]
+        elif kind == "last":
+            nodes = nodes[-1:]
+        elif kind == "@":
+            nodes = [node for node in nodes if argument[0] in node.list_attributes()]
+        elif kind == "=":
+            nodes = [node for node in nodes if node.attribute_value(argument[0]) == argument[1]]
+        else:
+            nodes = [
+                node
+                for node in nodes
+                if argument[0] in node.list_attributes() and node.attribute_value(argument[0]) != argument[1]
+            ]
+        if len(nodes) == 0:
+            break
+    return nodes
+
+
+def _children(context: list, name: str, predicates: tuple) -> list:
+    selected = []
+    for node in context:
+        children = [child for child in node.children if name is None or child.name == name]
+        selected.extend(apply_predicates(children, predicates) if predicates else children)
+    return selected
+
+
+def _descendants(context: list, name: str, predicates: tuple) -> list:
+    """
+    Selects the descendants of the context nodes in document order; predicates apply
+    per parent, as for descendant-or-self::node()/child::name in XPath
+    """
+    selected = []
+    walked = set()
+    for node in context:
+        # The descendants of a context node nested in an earlier one have been found
+        ancestor = node
+        while ancestor is not None and id(ancestor) not in walked:
+            ancestor = getattr(ancestor, "parent", None)
+        if ancestor is not None:
+            continue
+        walked.add(id(node))
+        if isinstance(node, _Document):
+            root = node.children[0]
+            found = [root] if name is None or root.name == name else []
+            node = root
+        else:
+            found = []
+        if name is None:
+            found.extend(traverse.descendants(node))
+        else:
+            node.find_all_descendants(name, found)
+        if predicates:
+            siblings = {}
+            for child in found:
+                siblings.setdefault(id(child.parent), []).append(child)
+            kept = set()
+            for group in siblings.values():
+                kept.update(id(child) for child in apply_predicates(group, predicates))
+            found = [child for child in found if id(child) in kept]
+        selected.extend(found)
+    return selected
+
+
+class XPath(object):
+    """
+    Compiled XPath subset expression; see the module documentation for the syntax
+    """
+
+    __slots__ = ("_expression", "_absolute", "_steps", "_root_name", "_path")
+
+    def __init__(self, expression: str):
+        self._expression = expression
+        self._absolute, self._steps = _parse(expression)
+        # A path of plain child name steps is answered by a compiled name-path query;
+        # the first name of an absolute path is that of the root node
+        self._root_name = None
+        self._path = None
+        if len(self._steps) > 0 and all(
+            axis == CHILD and name is not None and not predicates for axis, name, predicates in self._steps
+        ):
+            names = tuple(name for _, name, _ in self._steps)
+            if self._absolute:
+                self._root_name, names = names[0], names[1:]
+            self._path = query.compile(names)
+
+    def __repr__(self):
+        return f"XPath({self._expression!r})"
+
+    @property
+    def expression(self) -> str:
+        return self._expression
+
+    @property
+    def absolute(self) -> bool:
+        return self._absolute
+
+    @property
+    def steps(self) -> tuple:
+        """
+        Returns the compiled location steps: a tuple of (axis, name, predicates), where
+        axis is CHILD or DESCENDANT, name is None for "*", and each predicate is a tuple
+        of (kind, argument), kind being "position", "last", "@", "=", or "!="
+        """
+        return self._steps
+
+    def select(self, node) -> list:
+        """
+        Returns the nodes selected by the expression, in document order, evaluating
+        a relative expression from node and an absolute one from the root of its tree
+
+        Args:
+            node: context Node
+
+        Returns:
+            List of Nodes, which may be empty
+        """
+        if self._absolute:
+            while node.parent is not None:
+                node = node.parent
+        if self._path is not None:
+            if not self._absolute:
+                return self._path.find_all(node)
+            elif node.name != self._root_name:
+                return []
+            return self._path.find_all(node) if len(self._path.names) > 0 else [node]
+        context = [_Document(node)] if self._absolute else [node]
+        for axis, name, predicates in self._steps:
+            if axis == CHILD:
+                context = _children(context, name, predicates)
+            else:
+                context = _descendants(context, name, predicates)
+            if len(context) == 0:
+                break
+        return [node for node in context if not isinstance(node, _Document)]
+
+    def select_first(self, node):
+        """
+        Returns the first node selected by the expression, or None
+
+        Args:
+            node: context Node
+
+        Returns:
+            Node or None
+        """
+        selected = self.select(node)
+        return selected[0] if selected else None
+
+
+@functools.lru_cache(maxsize=1024)
+def compile(expression: str) -> XPath:
+    """
+    Compiles an XPath subset expression; compiled expressions are cached.
+
+    Args:
+        expression: XPath subset expression
+
+    Returns:
+        XPath
+
+    Raises:
+        ValueError: the expression is not supported
+    """
+    return XPath(expression)
+
+
+def path(node, cache: dict = None) -> str:
+    """
+    Returns the absolute location path of a node, e.g., "/eml/dataset/dataTable[2]/physical";
+    a position is given only where the parent has more than one child of the same name,
+    so that select(node, path(node)) returns [node].
+
+    Args:
+        node: Node
+        cache: optional dict, shared by calls on nodes of an unchanged tree, in which the
+            paths of the siblings of each node on the way are kept
+
+    Returns:
+        Absolute location path
+    """
+    if cache is None:
+        cache = {}
+    lineage = []
+    while node is not None and id(node) not in cache:
+        lineage.append(node)
+        node = node.parent
+    for node in reversed(lineage):
+        parent = node.parent
+        if parent is None:
+            cache[id(node)] = "/" + node.name
+            continue
+        # The paths of all children of the parent are found in one pass over them
+        parent_path = cache[id(parent)]
+        counts = {}
+        for child in parent.children:
+            counts[child.name] = counts.get(child.name, 0) + 1
+        positions = {}
+        for child in parent.children:
+            name = child.name
+            if counts[name] > 1:
+                positions[name] = positions.get(name, 0) + 1
+                cache[id(child)] = f"{parent_path}/{name}[{positions[name]}]"
+            else:
+                cache[id(child)] = f"{parent_path}/{name}"
+        if id(node) not in cache:
+            # A node that names a parent which does not list it as a child
+            cache[id(node)] = f"{parent_path}/{node.name}"
+    return cache[id(node)]
+
+
+def select(node, expression: str) -> list:
+    """
+    Returns the nodes selected by the XPath subset expression from node
+
+    Args:
+        node: context Node
+        expression: XPath subset expression
+
+    Returns:
+        List of Nodes, which may be empty
+    """
+    return compile(expression).select(node)
@@ -13,7 +13,13 @@
 :Created:
     6/18/18
 """
+from concurrent.futures import ThreadPoolExecutor
+import gc
+import json
+import pickle
+
 import daiquiri
+from lxml import etree
 import pytest
 import os
 
@@ -23,9 +29,12 @@ import metapype.eml.names as names
 import metapype.eml.rule as rule
 from metapype.eml.rule import Rule
 import metapype.eml.validate as validate
+from metapype.eml import batch
 import metapype.model.metapype_io as metapype_io
-from metapype.model.node import Node
-from metapype.eml.validation_errors import ValidationError
+from metapype.model import changes
+from metapype.model.node import Node, Shift
+from metapype.eml import validation_errors
+from metapype.eml.validation_errors import LazyMessage, ValidationError, ValidationErrorRecord
 
 logger = daiquiri.getLogger("test_eml: " + __name__)
 
@@ -766,3 +775,299 @@ def test_measurement_scale():
     print("\n")
     print(metapype_io.graph(measurement_scale))
     validate.tree(measurement_scale)
+
+
+def test_compile_children():
+    compiled = rule.get_compiled_children(rule.RULE_UNIT)
+    assert compiled[0] == rule.SEQUENCE
+    choice = compiled[1][0]
+    assert choice[0] == rule.CHOICE
+    assert choice[2] == frozenset((names.STANDARDUNIT, names.CUSTOMUNIT))
+    assert rule.get_compiled_children(rule.RULE_METADATA) is None
+    assert rule.get_compiled_children(rule.RULE_UNIT) is compiled
+
+
+def test_validate_children_errors():
+    contact = Node(names.CONTACT)
+    contact.add_child(Node(names.PHONE))
+    contact.add_child(Node(names.INDIVIDUALNAME))
+    errs = []
+    validate.node(contact, errs)
+    # Identical children shapes must yield identical errors on every node
+    other = Node(names.CONTACT)
+    other.add_child(Node(names.PHONE))
+    other.add_child(Node(names.INDIVIDUALNAME))
+    other_errs = []
+    validate.node(other, other_errs)
+    assert [e[0] for e in errs] == [e[0] for e in other_errs]
+    assert errs[0][0] == ValidationError.MIN_CHOICE_UNMET
+    assert errs[0][2] is contact
+    assert other_errs[0][2] is other
+
+
+def test_get_rule_shared():
+    assert rule.get_rule(names.CREATOR) is rule.get_rule(names.CONTACT)
+    assert rule.get_rule(names.ACCESS) is rule.get_rule(names.ACCESS)
+
+
+def test_validate_tree_concurrent():
+    with open(f"{tests.test_data_path}/eml.xml", "r") as f:
+        xml = "".join(f.readlines())
+    eml = metapype_io.from_xml(xml)
+    bad = metapype_io.from_xml(xml)
+    bad.find_descendant(names.CREATOR).add_child(Node(names.TITLE))
+    expected = list()
+    validate.tree(bad, expected)
+    assert len(expected) > 0
+
+    def work(_):
+        good_errs = list()
+        validate.tree(eml, good_errs)
+        bad_errs = list()
+        validate.tree(bad, bad_errs)
+        return good_errs, bad_errs
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        for good_errs, bad_errs in executor.map(work, range(32)):
+            assert good_errs == []
+            assert bad_errs == expected
+
+
+def test_validate_batch(tmp_path):
+    with open(f"{tests.test_data_path}/eml.xml", "r") as f:
+        xml = f.read()
+    bad = metapype_io.from_xml(xml)
+    bad.find_descendant(names.INDIVIDUALNAME).add_child(Node(names.TITLE))
+    bad_xml = metapype_io.to_xml(bad)
+    expected = list()
+    validate.tree(bad, expected)
+    (tmp_path / "bad.xml").write_text(bad_xml)
+    documents = [xml, tmp_path / "bad.xml", bad_xml.encode("utf-8"), str(tmp_path / "missing.xml")]
+    for workers, ordered in ((1, True), (2, True), (2, False)):
+        results = sorted(validate.batch(documents, workers=workers, ordered=ordered))
+        assert [result.index for result in results] == [0, 1, 2, 3]
+        assert results[0].records == []
+        assert results[1].source == str(tmp_path / "bad.xml")
+        for result in results[1:3]:
+            assert [(r.code, r.message, r.path, r.args) for r in result.records] == [
+                (e.code, e.message, e.path, e.args) for e in expected
+            ]
+        assert results[3].records == [] and results[3].failure.startswith("OSError")
+
+
+def _check_titled(root, entries):
+    if root.find_descendant(names.TITLE) is None:
+        raise ValueError("No title")
+    validate.tree(root, entries)
+
+
+def test_batch_failure_in_the_middle():
+    with open(f"{tests.test_data_path}/eml.xml", "r") as f:
+        xml = f.read()
+    documents = [xml, 42, "<eml/>", xml]
+    for workers in (1, 2):
+        results = list(batch.run(_check_titled, documents, workers=workers))
+        assert [result.index for result in results] == [0, 1, 2, 3]
+        assert [result.failure for result in results] == [
+            None,
+            "TypeError: expected str, bytes or os.PathLike object, not int",
+            "ValueError: No title",
+            None,
+        ]
+        assert results[0].records == results[3].records
+
+
+def test_validation_error_record():
+    with open(f"{tests.test_data_path}/eml.xml", "r") as f:
+        eml = metapype_io.from_xml(f.read())
+    individual_name = eml.find_descendant(names.INDIVIDUALNAME)
+    individual_name.add_child(Node(names.TITLE))
+    errs = list()
+    validate.tree(eml, errs)
+    err = errs[0]
+    assert isinstance(err, ValidationErrorRecord)
+    # The path is found when it is first read
+    assert err._path is None
+    code, msg, node, *args = err
+    assert (code, node, args) == (ValidationError.CHILD_NOT_ALLOWED, individual_name, ["title"])
+    assert err[2] is individual_name and tuple(err) == (code, msg, node, *args)
+    assert err != tuple(err)
+    hashed = hash(err)
+    validation_errors.resolve_paths([err], refresh=True)
+    assert hash(err) == hashed and err in {err}
+    assert err.path == "/eml/dataset/creator/individualName" and err.node_id == individual_name.id
+    copy = pickle.loads(pickle.dumps(err))
+    assert copy == err and copy.node is None
+    assert json.loads(json.dumps(err.to_dict()))["code"] == "CHILD_NOT_ALLOWED"
+    Node.delete_node_instances([eml])
+    del eml, individual_name, node
+    gc.collect()
+    assert err.node is None and err.path == "/eml/dataset/creator/individualName"
+
+
+def test_lazy_error_message():
+    access = Node(names.ACCESS)
+    access.add_attribute("authSystem", "pasta")
+    access.add_attribute("order", "sideways")
+    errs = list()
+    validate.node(access, errs)
+    err = next(err for err in errs if err.code == ValidationError.ATTRIBUTE_EXPECTED_ENUM)
+    assert isinstance(err._message, LazyMessage)
+    with pytest.raises(MetapypeRuleError) as ei:
+        validate.node(access)
+    assert err.message == str(ei.value)
+    assert err.message.startswith('Node "access" attribute "order" must be one of the following')
+
+
+def test_validate_max_errors():
+    with open(f"{tests.test_data_path}/eml.xml", "r") as f:
+        eml = metapype_io.from_xml(f.read())
+    assert validate.is_valid(eml)
+    for individual_name in eml.find_all_nodes_by_path([names.DATASET, names.CREATOR, names.INDIVIDUALNAME]):
+        individual_name.add_child(Node(names.TITLE))
+    expected = list()
+    validate.tree(eml, expected)
+    assert len(expected) >= 3
+    assert not validate.is_valid(eml)
+    for max_errors in (1, 2, len(expected) + 1):
+        errs = list()
+        validate.tree(eml, errs, max_errors=max_errors)
+        assert errs == expected[:max_errors]
+    with pytest.raises(ValueError):
+        validate.tree(eml, [], max_errors=0)
+    results = list(validate.batch([metapype_io.to_xml(eml)], workers=1, max_errors=2))
+    assert [record.code for record in results[0].records] == [err.code for err in expected[:2]]
+
+
+def test_content_checks():
+    cases = (
+        (names.PERMISSION, "read", []),
+        (names.PERMISSION, "delete", [ValidationError.CONTENT_EXPECTED_ENUM]),
+        (names.LINENUMBER, "12", []),
+        (names.LINENUMBER, "twelve", [ValidationError.CONTENT_EXPECTED_INT]),
+        (names.WESTBOUNDINGCOORDINATE, "-120.5", []),
+        (names.WESTBOUNDINGCOORDINATE, "200", [ValidationError.CONTENT_EXPECTED_RANGE]),
+        (names.WESTBOUNDINGCOORDINATE, "west", [ValidationError.CONTENT_EXPECTED_FLOAT]),
+    )
+    for name, content, codes in cases:
+        errs = list()
+        validate.node(Node(name, content=content), errs)
+        assert [err.code for err in errs] == codes
+    assert rule.get_rule(names.PERMISSION).content_enum == ["all", "changePermission", "read", "write"]
+    # Unhashable values are reported rather than raising TypeError
+    permission = Node(names.PERMISSION)
+    permission._content = ["read"]
+    errs = list()
+    validate.node(permission, errs)
+    assert [err.code for err in errs] == [
+        ValidationError.CONTENT_EXPECTED_STRING,
+        ValidationError.CONTENT_EXPECTED_ENUM,
+    ]
+    access = Node(names.ACCESS)
+    access.add_attribute("authSystem", "pasta")
+    access.add_attribute("order", ["allowFirst"])
+    errs = list()
+    validate.node(access, errs)
+    assert ValidationError.ATTRIBUTE_EXPECTED_ENUM in [err.code for err in errs]
+    # Codes that existed before CONTENT_EXPECTED_INT keep their values
+    assert ValidationError.CONTENT_EXPECTED_NONEMPTY.value == 8
+    assert ValidationError.UNKNOWN_NODE.value == 21
+    assert ValidationError.CONTENT_EXPECTED_INT.value == 22
+
+
+def test_content_predicates():
+    rule.clear_content_caches()
+    assert rule.Rule.is_uri("https://edirepository.org/data")
+    assert rule.Rule.is_uri("https://edirepository.org/data")
+    assert not rule.Rule.is_uri("edirepository.org")
+    assert rule.content_cache_info()["is_uri"].hits == 1
+    assert [rule.Rule.is_yeardate(v) for v in ("2020", "2020-1-5", "2020-02-30", "20", None)] == [
+        True, True, False, False, False
+    ]
+    assert [rule.Rule.is_time(v) for v in ("12:00:00", "T12:00", "noon")] == [True, True, False]
+    assert [rule.Rule.is_float(v) for v in ("-1.5e3", "nan", "1,5", 2)] == [True, True, False, True]
+    assert [rule.Rule.is_int(v) for v in ("+12", " 12 ", "1.5", [])] == [True, True, False, False]
+
+
+def test_validate_xml():
+    with open(f"{tests.test_data_path}/eml.xml", "rb") as f:
+        xml = f.read()
+    errs = list()
+    validate.xml(xml, errs)
+    assert errs == []
+    e = etree.fromstring(xml)
+    dataset = e.find("dataset")
+    dataset.set("bogus", "x")
+    dataset.insert(0, etree.Comment("A comment is not a node"))
+    dataset.find("title").append(etree.Element("para"))
+    for coordinate in e.iter("westBoundingCoordinate"):
+        coordinate.text = " west "
+    e.find("dataset/creator/individualName").append(etree.Element("bogus"))
+    with Node.store_scope():
+        eml = metapype_io.from_xml(etree.tostring(e))
+    expected = list()
+    validate.tree(eml, expected)
+    assert len(expected) >= 5
+    errs = list()
+    validate.xml(e, errs)
+    assert [(err.code, err.message, err.path, err.args) for err in errs] == [
+        (err.code, err.message, err.path, err.args) for err in expected
+    ]
+    assert all(err.node_id is None for err in errs)
+    errs = list()
+    validate.xml(etree.tostring(e), errs, max_errors=2)
+    assert [err.path for err in errs] == [err.path for err in expected[:2]]
+    with pytest.raises(MetapypeRuleError):
+        validate.xml(e)
+
+
+def test_incremental_validator():
+    with open(f"{tests.test_data_path}/eml.xml", "r") as f:
+        eml = metapype_io.from_xml(f.read())
+    dataset = eml.find_child(names.DATASET)
+    creator = dataset.find_child(names.CREATOR)
+    para = Node(names.PARA)
+
+    def assert_up_to_date(validator):
+        expected = list()
+        validate.tree(eml, expected)
+        errs = validator.errors()
+        assert [(err.code, err.message, err.path, err.args) for err in errs] == [
+            (err.code, err.message, err.path, err.args) for err in expected
+        ]
+        assert validator.is_valid() == (len(expected) == 0)
+
+    with validate.IncrementalValidator(eml) as validator:
+        assert validator.errors() == []
+        dataset.find_child(names.TITLE).content = ""
+        assert_up_to_date(validator)
+        dataset.add_child(para, 0)
+        creator.add_attribute("bogus", "x")
+        assert_up_to_date(validator)
+        creator.find_child(names.INDIVIDUALNAME).add_child(Node(names.TITLE))
+        dataset.shift(para, Shift.RIGHT, sib=False)
+        assert_up_to_date(validator)
+        creator.remove_attribute("bogus")
+        dataset.remove_child(para)
+        assert_up_to_date(validator)
+        creator.name = names.METADATA
+        assert_up_to_date(validator)
+        creator.name = names.CREATOR
+        assert_up_to_date(validator)
+        assert not validator.is_valid()
+        # Copying a node changes neither it nor its tree
+        dataset.copy()
+        assert_up_to_date(validator)
+    assert not changes.watching()
+
+
+def test_max_occurrence_exceeded_names_rule_child():
+    individual_name = Node(names.INDIVIDUALNAME)
+    for surname in ("Gaucho", "Marx"):
+        individual_name.add_child(Node(names.SURNAME, content=surname))
+    errs = list()
+    validate.node(individual_name, errs)
+    assert [(err.code, err.args) for err in errs] == [
+        (ValidationError.MAX_OCCURRENCE_EXCEEDED, (names.SURNAME, 1))
+    ]
+    assert errs[0].message == "Maximum occurrence of '1' exceeded for child 'surName' in parent 'individualName'"
@@ -18,7 +18,9 @@ import daiquiri
 
 from metapype.eml import evaluate
 from metapype.eml import names
+from metapype.model import metapype_io
 from metapype.model.node import Node
+import tests
 
 
 logger = daiquiri.getLogger(__name__)
@@ -30,4 +32,16 @@ def test_title_rule():
     title.content = "Test Title too short"
     assert len(evaluate._title_rule(title)) != 0
     title.content = "This test title is long enough so that it should not fail the tile rule"
-    assert len(evaluate._title_rule(title)) == 0
\ No newline at end of file
+    assert len(evaluate._title_rule(title)) == 0
+
+
+def test_evaluate_batch():
+    with open(f"{tests.test_data_path}/eml.xml", "r") as f:
+        xml = f.read()
+    expected = list()
+    evaluate.tree(metapype_io.from_xml(xml), expected)
+    assert len(expected) > 0
+    results = list(evaluate.batch([xml, xml], workers=2))
+    assert [result.index for result in results] == [0, 1]
+    for result in results:
+        assert [(code, msg) for code, msg, *_ in result.records] == [(code, msg) for code, msg, _ in expected]
@@ -0,0 +1,85 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+""":Mod: test_extract
+
+:Synopsis:
+
+:Author:
+    agent
+
+:Created:
+    10/17/26
+"""
+import os
+
+import daiquiri
+import pytest
+
+from metapype.eml import names
+from metapype.model import extract
+from metapype.model import metapype_io
+from metapype.model import xpath
+from metapype.model.node import Node
+import tests
+
+
+logger = daiquiri.getLogger("test_extract: " + __name__)
+
+
+QUERIES = {
+    "root": "/eml",
+    "title": "/eml/dataset/title",
+    "surnames": "//creator/individualName/surName",
+    "size": "//dataTable[2]/physical/size",
+    "attribute_names": "//attribute[1]/attributeName",
+    "ids": "//*[@id]",
+    "attributes": "//attributeList/attribute[@id][2]",
+    "keywords": "/eml//keyword",
+    "contacts": "dataset/contact[@id!='x']",
+    "self": ".",
+    "bogus": "/bogus",
+}
+
+
+@pytest.fixture()
+def eml_file():
+    if "TEST_DATA" in os.environ:
+        test_data = os.environ["TEST_DATA"]
+    else:
+        test_data = tests.test_data_path
+    return f"{test_data}/eml.xml"
+
+
+def test_extract(eml_file):
+    queries = dict(QUERIES, last="//dataTable[last()]")
+    extractor = extract.Extractor(queries)
+    with Node.store_scope():
+        eml = metapype_io.from_xml_file(eml_file)
+        results = extractor.extract(eml)
+        assert list(results.keys()) == list(queries.keys())
+        for key, expression in queries.items():
+            assert results[key] == xpath.select(eml, expression)
+        assert len(results["ids"]) > 1
+        dataset = eml.find_child(names.DATASET)
+        results = extractor.extract(dataset)
+        assert results["self"] == [dataset]
+        assert results["contacts"] == []
+        assert results["title"] == xpath.select(eml, QUERIES["title"])
+
+
+def test_extract_stream(eml_file):
+    extractor = extract.Extractor(QUERIES)
+    with Node.store_scope():
+        eml = metapype_io.from_xml_file(eml_file)
+        expected = extractor.extract(eml)
+        results = extractor.extract_stream(eml_file, register=False)
+        assert results.keys() == expected.keys()
+        for key in results:
+            assert len(results[key]) == len(expected[key])
+            for node, expected_node in zip(results[key], expected[key]):
+                expected_node.tail = None
+                assert metapype_io.to_xml(node) == metapype_io.to_xml(expected_node)
+                assert Node.get_node_instance(node.id) is None
+    with pytest.raises(ValueError):
+        extract.Extractor({"last": "//dataTable[last()]"}).extract_stream(eml_file)
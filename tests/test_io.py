@@ -13,9 +13,12 @@
 :Created:
     1/14/19
 """
+import io
 import os
+import pathlib
 
 import daiquiri
+import pytest
 
 import tests
 from metapype.eml import validate
@@ -51,6 +54,60 @@ def test_from_xml():
     validate.tree(eml)
 
 
+def test_from_xml_sources():
+    if "TEST_DATA" in os.environ:
+        xml_path = os.environ["TEST_DATA"]
+    else:
+        xml_path = tests.test_data_path
+
+    with open(f"{xml_path}/eml.xml", "r") as f:
+        xml = "".join(f.readlines())
+    expected = metapype_io.to_xml(metapype_io.from_xml(xml))
+    with open(f"{xml_path}/eml.xml", "rb") as f:
+        xml_bytes = f.read()
+    for source in (xml_bytes, memoryview(xml_bytes), io.BytesIO(xml_bytes), pathlib.Path(xml_path, "eml.xml")):
+        eml = metapype_io.from_xml(source)
+        assert metapype_io.to_xml(eml) == expected
+    for source in (f"{xml_path}/eml.xml", pathlib.Path(xml_path, "eml.xml"), io.BytesIO(xml_bytes)):
+        eml = metapype_io.from_xml_file(source)
+        assert metapype_io.to_xml(eml) == expected
+        validate.tree(eml)
+
+
+def test_from_xml_unregistered():
+    if "TEST_DATA" in os.environ:
+        xml_path = os.environ["TEST_DATA"]
+    else:
+        xml_path = tests.test_data_path
+
+    with Node.store_scope() as store:
+        for load in (metapype_io.from_xml_file, metapype_io.from_xml_stream):
+            eml = load(f"{xml_path}/eml.xml", register=False)
+            assert len(store) == 0
+            validate.prune(eml)
+            validate.tree(eml)
+            assert eml.id_index()[eml.id] is eml
+        assert len(store) == 0
+
+
+def test_from_xml_stream():
+    if "TEST_DATA" in os.environ:
+        xml_path = os.environ["TEST_DATA"]
+    else:
+        xml_path = tests.test_data_path
+
+    with open(f"{xml_path}/eml.xml", "r") as f:
+        xml = "".join(f.readlines())
+    expected = metapype_io.to_xml(metapype_io.from_xml(xml, literals=("literalLayout", "markdown")))
+    with open(f"{xml_path}/eml.xml", "rb") as f:
+        stream = io.BytesIO(f.read())
+    for source in (f"{xml_path}/eml.xml", pathlib.Path(xml_path, "eml.xml"), stream):
+        eml = metapype_io.from_xml_stream(source, literals=("literalLayout", "markdown"))
+        assert isinstance(eml, Node)
+        assert metapype_io.to_xml(eml) == expected
+        validate.tree(eml)
+
+
 def test_to_json():
     if "TEST_DATA" in os.environ:
         xml_path = os.environ["TEST_DATA"]
@@ -81,6 +138,26 @@ def test_to_xml():
     assert isinstance(xml, str)
 
 
+def test_to_xml_out(tmp_path):
+    if "TEST_DATA" in os.environ:
+        test_data = os.environ["TEST_DATA"]
+    else:
+        test_data = tests.test_data_path
+
+    eml = metapype_io.from_xml_file(f"{test_data}/eml.xml")
+    xml = metapype_io.to_xml(eml)
+    text = io.StringIO()
+    assert metapype_io.to_xml(eml, out=text) is None
+    assert text.getvalue() == xml
+    binary = io.BytesIO()
+    metapype_io.to_xml(eml, out=binary)
+    assert binary.getvalue() == xml.encode("utf-8")
+    with open(tmp_path / "eml.xml", "wb") as f:
+        metapype_io.to_xml(eml, out=f)
+    with open(tmp_path / "eml.xml", "r", encoding="utf-8") as f:
+        assert f.read() == xml
+
+
 def test_graph():
     if "TEST_DATA" in os.environ:
         xml_path = os.environ["TEST_DATA"]
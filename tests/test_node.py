@@ -13,12 +13,17 @@
 :Created:
     6/18/18
 """
+import gc
+import sys
+import weakref
+
 import daiquiri
 import pytest
-import sys
 
 from metapype.eml import names
 from metapype.eml import validate
+from metapype.model import changes
+from metapype.model.node import CounterId
 from metapype.model.node import Node
 from metapype.model.node import Shift
 
@@ -354,6 +359,23 @@ def test_delete_node_no_children():
     assert principal.id in Node._store()
 
 
+def test_delete_node_instances():
+    with Node.store_scope() as store:
+        eml = Node(names.EML)
+        access = Node(names.ACCESS)
+        eml.add_child(access)
+        allow = Node(names.ALLOW)
+        access.add_child(allow)
+        dataset = Node(names.DATASET)
+        eml.add_child(dataset)
+        title = Node(names.TITLE)
+        dataset.add_child(title)
+        removed = Node.delete_node_instances([access, dataset], return_ids=True)
+        assert sorted(removed) == sorted([access.id, allow.id, dataset.id, title.id])
+        assert list(store) == [eml.id]
+        assert Node.delete_node_instances([access]) is None
+
+
 def test_nsmap():
     a = Node("a")
     b = Node("b")
@@ -406,6 +428,98 @@ def test_nsmap():
            "x" not in c.nsmap and "x" not in d.nsmap and "x" not in e.nsmap
 
 
+def test_slots():
+    a = Node("a")
+    b = Node("b")
+    assert not hasattr(a, "__dict__")
+    assert a.list_attributes() == [] and a.list_extras() == []
+    assert str(a) is not None
+    a.add_attribute("id", "a.1")
+    assert a.attributes == {"id": "a.1"}
+    assert b.attribute_value("id") is None
+    b.attributes["id"] = "b.1"
+    assert b.attribute_value("id") == "b.1"
+    b.add_extras("xsi:type", "b")
+    c = b.copy()
+    c.attributes["id"] = "c.1"
+    c.extras["xsi:type"] = "c"
+    assert b.attributes == {"id": "b.1"} and b.extras == {"xsi:type": "b"}
+    with pytest.raises(KeyError):
+        Node("d").remove_attribute("id")
+
+
+def test_id_factory():
+    try:
+        Node.set_id_factory(CounterId())
+        a = Node("a")
+        b = a.copy()
+        prefix, count = a.id.rsplit("-", 1)
+        assert b.id == f"{prefix}-{int(count) + 1}"
+        assert Node.get_node_instance(b.id) is b
+        Node.set_id_factory(CounterId(), lazy=True)
+        with Node.store_scope() as store:
+            c = Node("c")
+            assert c.id in store
+        assert Node("d", id="d.1").id == "d.1"
+    finally:
+        Node.set_id_factory()
+    assert len(Node("e").id) == 36
+    # A factory that is no longer used is not kept alive by the fork hook
+    counter_id = weakref.ref(CounterId())
+    gc.collect()
+    assert counter_id() is None
+
+
+def test_is_equal_compares_all_children():
+    dataset1 = Node(names.DATASET)
+    dataset2 = Node(names.DATASET)
+    for dataset, keyword in ((dataset1, "soil"), (dataset2, "water")):
+        dataset.add_child(Node(names.TITLE, content="Title"))
+        dataset.add_child(Node(names.KEYWORD, content=keyword))
+    assert not Node.is_equal(dataset1, dataset2)
+    dataset2.children[1].content = "soil"
+    assert Node.is_equal(dataset1, dataset2)
+
+
+def test_changes_reach_only_watchers_of_the_tree():
+    class Watcher:
+        def __init__(self):
+            self.calls = []
+
+        def changed(self, node, children):
+            self.calls.append(("changed", node, children))
+
+        def added(self, node):
+            self.calls.append(("added", node))
+
+        def removed(self, node):
+            self.calls.append(("removed", node))
+
+    eml = Node(names.EML)
+    other = Node(names.EML)
+    watcher = Watcher()
+    changes.watch(eml, watcher)
+    assert changes.watching()
+    other.add_child(Node(names.DATASET))
+    other.content = "x"
+    assert watcher.calls == []
+    dataset = Node(names.DATASET)
+    eml.add_child(dataset)
+    dataset.content = "x"
+    eml.shift(dataset, Shift.LEFT)
+    eml.remove_child(dataset)
+    assert watcher.calls == [
+        ("added", dataset),
+        ("changed", eml, True),
+        ("changed", dataset, False),
+        ("changed", eml, True),
+        ("removed", dataset),
+        ("changed", eml, True),
+    ]
+    changes.unwatch(eml, watcher)
+    assert not changes.watching()
+
+
 def is_deep_copy(node1: Node, node2: Node) -> bool:
     if id(node1) == id(node2):
         return False
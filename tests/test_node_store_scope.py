@@ -18,11 +18,12 @@
     3/3/2026
 """
 
+import gc
 import threading
 import queue
 import pytest
 
-from metapype.model.node import Node
+from metapype.model.node import Node, WeakNodeStore
 
 
 def _worker_handshake(name: str,
@@ -127,3 +128,60 @@ def test_store_restores_previous_context():
         # after inner exits, outer context is restored
         assert Node.get_node_instance(n1.id) is n1
         assert Node.get_node_instance(n2.id) is None
+
+
+def test_store_scope_without_registration():
+    """
+    Nodes created in a scope without registration are not stored anywhere;
+    an identifier index is built on demand instead.
+    """
+    with Node.store_scope() as outer:
+        with Node.store_scope(register=False) as store:
+            assert store is None
+            parent = Node("parent")
+            child = Node("child")
+            parent.add_child(child)
+            assert Node.get_node_instance(parent.id) is None
+            Node.delete_node_instance(parent.id)  # no-op without a store
+            index = parent.id_index()
+            assert index[parent.id] is parent and index[child.id] is child
+        assert len(outer) == 0
+        registered = Node("registered")
+        assert Node.get_node_instance(registered.id) is registered
+
+
+def test_weak_store():
+    """
+    A weak store drops the nodes of models that are no longer referenced, and
+    keeps track of the largest number of nodes it has held.
+    """
+    with Node.store_scope(weak=True) as store:
+        assert isinstance(store, WeakNodeStore)
+        parent = Node("parent")
+        for _ in range(3):
+            parent.add_child(Node("child"))
+        assert Node.get_node_instance(parent.id) is parent
+        assert Node.store_stats() == {"size": 4, "high_water_mark": 4, "weak": True}
+        del parent
+        gc.collect()
+        assert Node.store_stats() == {"size": 0, "high_water_mark": 4, "weak": True}
+
+
+def test_default_store():
+    """
+    The default store applies to contexts that have not set their own store,
+    including new threads.
+    """
+    store = WeakNodeStore()
+    previous = Node.set_default_store(store)
+    try:
+        nodes = []
+        thread = threading.Thread(target=lambda: nodes.append(Node("thread")))
+        thread.start()
+        thread.join(timeout=2)
+        assert nodes[0].id in store
+        with Node.store_scope() as scoped:
+            assert Node("scoped").id in scoped
+        assert Node.store_stats()["high_water_mark"] == 1
+    finally:
+        Node.set_default_store(previous)
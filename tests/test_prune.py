@@ -18,6 +18,7 @@ import daiquiri
 
 import metapype.model.metapype_io as metapype_io
 import metapype.eml.validate as validate
+from metapype.model.node import Node
 import tests
 
 
@@ -41,3 +42,23 @@ def test_prune():
     for err in errs:
         print(err)
 
+
+
+def test_prune_store():
+    xml = """
+        <eml:eml packageId="edi.23.1" system="metapype" xmlns:eml="https://eml.ecoinformatics.org/eml-2.2.0">
+            <dataset>
+                <title>Title</title>
+                <bogus><para>Not allowed</para></bogus>
+                <creator><individualName><surName>Gaucho</surName></individualName></creator>
+                <contact><individualName><surName>Gaucho</surName></individualName></contact>
+            </dataset>
+        </eml:eml>
+    """
+    with Node.store_scope() as store:
+        eml = metapype_io.from_xml(xml)
+        pruned = validate.prune(eml)
+        assert [node.name for node, _ in pruned] == ["bogus"]
+        assert pruned[0][0].id not in store
+        assert pruned[0][0].children[0].id not in store
+        assert len(store) == len(eml.id_index())
@@ -0,0 +1,130 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+""":Mod: test_query
+
+:Synopsis:
+
+:Author:
+    agent
+
+:Created:
+    10/17/26
+"""
+import os
+
+import daiquiri
+import pytest
+
+from metapype.eml import names
+from metapype.model import metapype_io
+from metapype.model import query
+from metapype.model import traverse
+from metapype.model.node import Node
+import tests
+
+
+logger = daiquiri.getLogger("test_query: " + __name__)
+
+
+PATHS = (
+    [names.DATASET, names.CREATOR, names.INDIVIDUALNAME, names.SURNAME],
+    [names.DATASET, names.DATATABLE, names.PHYSICAL, names.SIZE],
+    [names.DATASET, names.DATATABLE, names.ATTRIBUTELIST, names.ATTRIBUTE, names.ATTRIBUTENAME],
+    [names.DATASET, names.KEYWORDSET, names.KEYWORD],
+    [names.DATASET, names.CONTACT],
+    [names.ACCESS, names.ALLOW, names.PRINCIPAL],
+    [names.DATASET, "bogus"],
+)
+
+
+@pytest.fixture()
+def eml():
+    if "TEST_DATA" in os.environ:
+        test_data = os.environ["TEST_DATA"]
+    else:
+        test_data = tests.test_data_path
+    with Node.store_scope():
+        yield metapype_io.from_xml_file(f"{test_data}/eml.xml")
+
+
+def test_compile():
+    q = query.compile("dataset/creator/userId")
+    assert q.names == (names.DATASET, names.CREATOR, names.USERID)
+    assert query.compile([names.DATASET, names.CREATOR, names.USERID]) is q
+    assert query.compile(q) is q
+
+
+def test_path_index(eml):
+    expected = [(eml.find_all_nodes_by_path(path), eml.find_single_node_by_path(path)) for path in PATHS]
+    assert any(len(found) > 1 for found, _ in expected)
+    eml.build_index()
+    for path, (found, first) in zip(PATHS, expected):
+        assert eml.find_all_nodes_by_path(path) == found
+        assert eml.find_single_node_by_path(path) is first
+        assert query.compile(path).find_all(eml) == found
+    eml.drop_index()
+    assert eml.tree_index is None
+
+
+def test_path_index_invalidation(eml):
+    eml.build_index()
+    path = [names.DATASET, names.CREATOR]
+    creators = eml.find_all_nodes_by_path(path)
+    dataset = creators[0].parent
+    creator = Node(names.CREATOR)
+    dataset.add_child(creator, dataset.child_index(creators[-1]) + 1)
+    assert eml.find_all_nodes_by_path(path) == creators + [creator]
+    dataset.remove_child(creators[0])
+    assert eml.find_all_nodes_by_path(path) == creators[1:] + [creator]
+    assert eml.find_single_node_by_path(path) is (creators[1:] + [creator])[0]
+    creator.name = names.CONTACT
+    assert eml.find_all_nodes_by_path(path) == creators[1:]
+    eml.drop_index()
+    assert len([n for n in traverse.pre_order(eml) if n.tree_index is not None]) == 0
+
+
+def test_name_index(eml):
+    nodes = list(traverse.pre_order(eml))
+    queries = (names.PARA, names.ATTRIBUTENAME, names.SURNAME, names.INDIVIDUALNAME, "bogus")
+    expected = {}
+    for node in nodes:
+        for name in queries:
+            found = []
+            node.find_all_descendants(name, found)
+            expected[(node.id, name)] = (found, node.find_descendant(name))
+    eml.build_index()
+    for node in nodes:
+        for name in queries:
+            found = []
+            node.find_all_descendants(name, found)
+            assert (found, node.find_descendant(name)) == expected[(node.id, name)]
+    dataset = eml.find_child(names.DATASET)
+    surnames = []
+    dataset.find_all_descendants(names.SURNAME, surnames)
+    surname = surnames[0].copy()
+    surnames[0].parent.replace_child(surnames[0], surname)
+    assert dataset.find_descendant(names.SURNAME) is surname
+    eml.drop_index()
+
+
+def test_name_index_unlisted_nodes(eml):
+    eml.build_index()
+    dataset = eml.find_child(names.DATASET)
+    creator = dataset.find_child(names.CREATOR)
+    surname = creator.find_descendant(names.SURNAME)
+    # A removed node keeps its parent link
+    dataset.remove_child(creator)
+    assert creator.parent is dataset
+    assert creator.find_descendant(names.SURNAME) is surname
+    found = []
+    creator.find_all_descendants(names.SURNAME, found)
+    assert found == [surname]
+    # A node given a parent that does not list it
+    orphan = Node(names.CREATOR, parent=dataset)
+    orphan.add_child(Node(names.INDIVIDUALNAME))
+    assert orphan.find_descendant(names.INDIVIDUALNAME) is orphan.children[0]
+    stray = Node(names.KEYWORDSET)
+    stray.parent = dataset
+    assert stray.find_descendant(names.KEYWORD) is None
+    eml.drop_index()
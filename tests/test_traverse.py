@@ -0,0 +1,144 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+:Mod: test_traverse
+
+:Synopsis:
+
+:Author:
+    agent
+
+:Created:
+    10/17/26
+"""
+import sys
+
+import daiquiri
+import pytest
+
+from metapype.eml import evaluate
+from metapype.eml import names
+from metapype.eml import references
+from metapype.eml import validate
+from metapype.model import metapype_io
+from metapype.model import traverse
+from metapype.model.node import Node
+
+
+logger = daiquiri.getLogger(__name__)
+
+
+@pytest.fixture()
+def tree():
+    a = Node("a")
+    b = Node("b")
+    c = Node("c")
+    d = Node("d")
+    e = Node("e")
+    a.add_child(b)
+    b.add_child(c)
+    b.add_child(d)
+    a.add_child(e)
+    return a
+
+
+@pytest.fixture()
+def deep():
+    # Deeper than the recursion limit
+    depth = sys.getrecursionlimit() * 2
+    abstract = Node(names.ABSTRACT)
+    parent = abstract
+    for _ in range(depth):
+        section = Node(names.SECTION)
+        parent.add_child(section)
+        parent = section
+    parent.add_child(Node(names.PARA, content="Deep thoughts"))
+    return abstract
+
+
+def test_pre_order(tree):
+    assert [n.name for n in traverse.pre_order(tree)] == ["a", "b", "c", "d", "e"]
+    assert [n.name for n in traverse.descendants(tree)] == ["b", "c", "d", "e"]
+    descend = lambda n: n.name != "b"
+    assert [n.name for n in traverse.pre_order(tree, descend)] == ["a", "b", "e"]
+
+
+def test_post_order(tree):
+    assert [n.name for n in traverse.post_order(tree)] == ["c", "d", "b", "e", "a"]
+
+
+def test_walk(tree):
+    events = [(event, n.name, depth) for event, n, depth in traverse.walk(tree)]
+    assert events == [
+        (traverse.START, "a", 0),
+        (traverse.START, "b", 1),
+        (traverse.START, "c", 2),
+        (traverse.END, "c", 2),
+        (traverse.START, "d", 2),
+        (traverse.END, "d", 2),
+        (traverse.END, "b", 1),
+        (traverse.START, "e", 1),
+        (traverse.END, "e", 1),
+        (traverse.END, "a", 0),
+    ]
+
+
+def test_deep_tree(deep):
+    errs = []
+    validate.tree(deep, errs)
+    assert len(errs) == 0
+    assert validate.prune(deep, strict=True) == []
+    warnings = []
+    evaluate.tree(deep, warnings)
+    para = deep.find_descendant(names.PARA)
+    assert para.content == "Deep thoughts"
+    sections = []
+    deep.find_all_descendants(names.SECTION, sections)
+    assert len(sections) == sys.getrecursionlimit() * 2
+    deep_copy = deep.copy()
+    assert deep_copy.find_descendant(names.PARA) is not para
+    xml = metapype_io.to_xml(deep)
+    assert xml.count("<section>") == len(sections)
+    assert metapype_io.graph(deep).count(names.SECTION) == len(sections)
+    assert isinstance(metapype_io._serialize(deep), dict)
+
+
+def test_deep_tree_namespaces(deep):
+    assert Node.is_equal(deep, deep.copy())
+    deep.add_namespace("eml", "https://eml.ecoinformatics.org/eml-2.2.0")
+    para = deep.find_descendant(names.PARA)
+    assert para.nsmap["eml"] == "https://eml.ecoinformatics.org/eml-2.2.0"
+    deep.remove_namespace("eml")
+    assert "eml" not in para.nsmap
+    Node.fix_nsmap(deep, {"stmml": "http://www.xml-cml.org/schema/stmml-1.2"})
+    assert "stmml" in para.nsmap
+    deep.set_nsmap({})
+    assert para.nsmap == {}
+    parent = Node(names.DATASET)
+    parent.add_namespace("eml", "https://eml.ecoinformatics.org/eml-2.2.0")
+    parent.add_child(deep)
+    assert "eml" in para.nsmap
+    assert Node.is_equal(metapype_io._from_dict(metapype_io._serialize(deep)), deep)
+
+
+def test_deep_tree_references():
+    depth = sys.getrecursionlimit() * 2
+    dataset = Node(names.DATASET)
+    parent = dataset
+    for _ in range(depth):
+        section = Node(names.SECTION)
+        parent.add_child(section)
+        parent = section
+    parent.add_attribute("id", "deepest")
+    parent.add_child(Node(names.PARA, content="Deep thoughts"))
+    contact = Node(names.CONTACT)
+    dataset.add_child(contact)
+    contact.add_child(Node(names.REFERENCES, content="deepest"))
+    references.expand(dataset)
+    assert contact.children[0].name == names.PARA
+    duplicate = Node(names.PARA)
+    duplicate.add_attribute("id", "deepest")
+    contact.add_child(duplicate)
+    with pytest.raises(ValueError):
+        references.expand(dataset)
@@ -0,0 +1,99 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+""":Mod: test_xpath
+
+:Synopsis:
+
+:Author:
+    agent
+
+:Created:
+    10/17/26
+"""
+import os
+
+import daiquiri
+from lxml import etree
+import pytest
+
+from metapype.model import metapype_io
+from metapype.model import traverse
+from metapype.model import xpath
+from metapype.model.node import Node
+import tests
+
+
+logger = daiquiri.getLogger("test_xpath: " + __name__)
+
+
+EXPRESSIONS = (
+    "/eml",
+    "/eml/dataset/creator",
+    "//individualName/surName",
+    "//dataTable[2]/physical/size",
+    "//dataTable[last()]",
+    "//attribute[1]/attributeName",
+    "//*[@id]",
+    "//creator[@id='creator']",
+    "//attributeList/attribute[@id][2]",
+    "//attribute[2][@id]",
+    "/eml//keyword",
+    "/eml/dataset/contact[@id!='x']",
+    "//*[last()]",
+    "/bogus",
+)
+
+
+@pytest.fixture()
+def xml():
+    if "TEST_DATA" in os.environ:
+        test_data = os.environ["TEST_DATA"]
+    else:
+        test_data = tests.test_data_path
+    with open(f"{test_data}/eml.xml", "rb") as f:
+        return f.read()
+
+
+def _lxml_positions(xml: bytes) -> tuple:
+    # Compare against lxml's XPath on the same document without namespaces
+    root = etree.fromstring(xml)
+    for e in root.iter():
+        if isinstance(e.tag, str) and "}" in e.tag:
+            e.tag = e.tag.split("}")[1]
+    elements = [e for e in root.iter() if isinstance(e.tag, str)]
+    return root, {e: i for i, e in enumerate(elements)}
+
+
+def test_select(xml):
+    lxml_root, lxml_positions = _lxml_positions(xml)
+    with Node.store_scope():
+        eml = metapype_io.from_xml(xml)
+        positions = {id(n): i for i, n in enumerate(traverse.pre_order(eml))}
+        for indexed in (False, True):
+            if indexed:
+                eml.build_index()
+            for expression in EXPRESSIONS:
+                expected = [lxml_positions[e] for e in lxml_root.xpath(expression)]
+                assert [positions[id(n)] for n in xpath.select(eml, expression)] == expected
+            dataset = eml.find_child("dataset")
+            for expression in ("creator", ".//para", "dataTable[2]//attributeName", "*[1]"):
+                expected = [lxml_positions[e] for e in lxml_root.find("dataset").xpath(expression)]
+                assert [positions[id(n)] for n in xpath.select(dataset, expression)] == expected
+        eml.drop_index()
+
+
+def test_compile():
+    assert xpath.compile("//dataTable[1]") is xpath.compile("//dataTable[1]")
+    for expression in ("", "dataset//", "//[1]", "dataset[position()=1]", "dataset/../title", "a b"):
+        with pytest.raises(ValueError):
+            xpath.compile(expression)
+
+
+def test_path(xml):
+    with Node.store_scope():
+        eml = metapype_io.from_xml(xml)
+        for node in traverse.pre_order(eml):
+            assert xpath.select(eml, xpath.path(node)) == [node]
+        attribute = xpath.select(eml, "//attributeList/attribute[2]/attributeName")[0]
+        assert xpath.path(attribute) == "/eml/dataset/dataTable/attributeList/attribute[2]/attributeName"
@@ -0,0 +1,71 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+:Mod: import_time
+
+:Synopsis:
+    Report the time taken to import a module in a fresh interpreter, as the median
+    of several runs, and optionally the modules that take longest to import as
+    measured by "python -X importtime".
+
+    Usage: python utils/import_time.py [-r RUNS] [-t TOP] [MODULE]
+
+:Author:
+    agent
+
+:Created:
+    10/17/26
+"""
+import statistics
+import subprocess
+import sys
+
+import click
+import daiquiri
+
+
+logger = daiquiri.getLogger(__name__)
+
+
+help_runs = "Number of fresh interpreters in which to time the import (default 5)."
+help_top = "Number of slowest modules to list by their own import time (default 0)."
+CONTEXT_SETTINGS = dict(help_option_names=["-h", "--help"])
+
+TIMER = "import time; t = time.perf_counter(); import {}; print(time.perf_counter() - t)"
+
+
+def _time(module: str) -> float:
+    out = subprocess.run(
+        [sys.executable, "-c", TIMER.format(module)], capture_output=True, text=True, check=True
+    )
+    return float(out.stdout)
+
+
+def _slowest(module: str, top: int) -> list:
+    out = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"], capture_output=True, text=True, check=True
+    )
+    times = []
+    for line in out.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        own, _, name = line[len("import time:"):].split("|")
+        times.append((int(own), name.strip()))
+    return sorted(times, reverse=True)[:top]
+
+
+@click.command(context_settings=CONTEXT_SETTINGS)
+@click.argument("module", default="metapype.eml.validate")
+@click.option("-r", "--runs", default=5, help=help_runs)
+@click.option("-t", "--top", default=0, help=help_top)
+def main(module: str, runs: int, top: int):
+    times = [_time(module) for _ in range(runs)]
+    click.echo(f"Import of {module}: {statistics.median(times) * 1000:.1f} ms (median of {runs})")
+    for own, name in _slowest(module, top) if top > 0 else []:
+        click.echo(f"{own / 1000:8.1f} ms  {name}")
+    return 0
+
+
+if __name__ == "__main__":
+    main()
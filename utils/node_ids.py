@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+:Mod: node_ids
+
+:Synopsis:
+    Compare the cost of node identifier strategies: time per node to create nodes and
+    to load an EML XML document with each strategy. Nodes are not registered in a node
+    store, which would mint every identifier, so that lazy identifiers are not minted.
+
+    Usage: python utils/node_ids.py [-n NODES] [EML_XML_FILE]
+
+:Author:
+    agent
+
+:Created:
+    10/17/26
+"""
+import time
+
+import click
+import daiquiri
+
+from metapype.model import metapype_io
+from metapype.model import traverse
+from metapype.model.node import CounterId, Node, uuid1_id
+
+
+logger = daiquiri.getLogger(__name__)
+
+
+help_nodes = "Number of nodes to create per strategy (default 200000)."
+CONTEXT_SETTINGS = dict(help_option_names=["-h", "--help"])
+
+STRATEGIES = (
+    ("uuid1", uuid1_id, False),
+    ("counter", CounterId(), False),
+    ("lazy counter", CounterId(), True),
+)
+
+
+def _best_of(f, repeat: int = 3) -> float:
+    best = None
+    for _ in range(repeat):
+        with Node.store_scope(register=False):
+            start = time.perf_counter()
+            f()
+            elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+@click.command(context_settings=CONTEXT_SETTINGS)
+@click.argument("xml_file", required=False, type=click.Path(exists=True, dir_okay=False))
+@click.option("-n", "--nodes", default=200000, help=help_nodes)
+def main(xml_file: str, nodes: int):
+    xml = None
+    if xml_file is not None:
+        with open(xml_file, "rb") as f:
+            xml = f.read()
+        with Node.store_scope():
+            size = sum(1 for _ in traverse.pre_order(metapype_io.from_xml(xml)))
+    try:
+        for name, factory, lazy in STRATEGIES:
+            Node.set_id_factory(factory, lazy)
+            elapsed = _best_of(lambda: [Node("node") for _ in range(nodes)])
+            line = f"{name:>12}: create {elapsed / nodes * 1e6:.2f} us/node"
+            if xml is not None:
+                elapsed = _best_of(lambda: metapype_io.from_xml(xml))
+                line += f", from_xml {elapsed / size * 1e6:.2f} us/node"
+            click.echo(line)
+    finally:
+        Node.set_id_factory()
+    return 0
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+:Mod: node_memory
+
+:Synopsis:
+    Report the memory held by a Metapype model instance, per node, as measured by
+    tracemalloc while loading one or more copies of an EML XML document.
+
+    Usage: python utils/node_memory.py [-c COPIES] EML_XML_FILE
+
+:Author:
+    agent
+
+:Created:
+    10/17/26
+"""
+import gc
+import tracemalloc
+
+import click
+import daiquiri
+
+from metapype.model import metapype_io
+from metapype.model import traverse
+from metapype.model.node import Node
+
+
+logger = daiquiri.getLogger(__name__)
+
+
+help_copies = "Number of model instances to load and hold (default 10)."
+CONTEXT_SETTINGS = dict(help_option_names=["-h", "--help"])
+
+
+@click.command(context_settings=CONTEXT_SETTINGS)
+@click.argument("xml_file", type=click.Path(exists=True, dir_okay=False))
+@click.option("-c", "--copies", default=10, help=help_copies)
+def main(xml_file: str, copies: int):
+    with open(xml_file, "rb") as f:
+        xml = f.read()
+    with Node.store_scope():
+        gc.collect()
+        tracemalloc.start()
+        before = tracemalloc.take_snapshot()
+        models = [metapype_io.from_xml(xml) for _ in range(copies)]
+        gc.collect()
+        after = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+        size = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+        nodes = sum(1 for model in models for _ in traverse.pre_order(model))
+        click.echo(f"Nodes: {nodes}")
+        click.echo(f"Bytes: {size}")
+        click.echo(f"Bytes per node: {size / nodes:.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    main()